@@ -1,15 +1,21 @@
 from os.path import join
-from importlib.metadata import version
-__version__ = version('odsutils')
 
 try:
     import warnings
     from erfa import ErfaWarning
-    with warnings.catch_warnings():
-        warnings.filterwarnings("ignore", category=ErfaWarning)
+    warnings.filterwarnings("ignore", category=ErfaWarning)
 except ImportError:
     pass
 
+
+def __getattr__(name):
+    """Look up __version__ from the package metadata only when it is asked for."""
+    if name == '__version__':
+        from importlib.metadata import version
+        globals()['__version__'] = version('odsutils')
+        return globals()['__version__']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 DATA_PATH = join(__path__[0], 'data')
 LOG_FORMATS = {'conlog_format': "{asctime} - {levelname} - {module} - {message}",
                'filelog_format': "{asctime} - {levelname} - {module} - {message}"}
@@ -1,6 +1,11 @@
 import astropy.units as u
 from astropy.coordinates import EarthLocation
 import json
+from functools import lru_cache
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
 
 
 LOCATIONS = {
@@ -8,11 +13,45 @@ LOCATIONS = {
 }
 
 
+@lru_cache(maxsize=32)
+def _loads_location(locstr):
+    """Parse a stringified location -- cached since the same few sites are parsed over and over."""
+    return _loads(locstr)
+
+
+@lru_cache(maxsize=32)
+def get_earth_location(lat_deg, lon_deg, height_m):
+    """
+    Return an EarthLocation for the geodetic coordinates, cached since most records share a single site.
+
+    Parameters
+    ----------
+    lat_deg : float
+        Latitude in degrees
+    lon_deg : float
+        Longitude in degrees
+    height_m : float
+        Height in meters
+
+    Return
+    ------
+    EarthLocation
+
+    """
+    return EarthLocation(lat=lat_deg*u.deg, lon=lon_deg*u.deg, height=height_m*u.m)
+
+
+COORD_UNITS = {'lat': ('_lat_deg', u.deg), 'lon': ('_lon_deg', u.deg), 'height': ('_height_m', u.m)}
+
+
 class Location:
     def __init__(self, name='ata', tz='US/Pacific', loc=None, lat=None, lon=None, height=None):
         """
         This is a wrapper around the astropy.EarthLocation class, which is retained as the attribute 'loc'.
 
+        The coordinates are kept internally as plain floats (deg, deg, m); the lat/lon/height Quantities
+        are only built when asked for, and the EarthLocation comes from the get_earth_location cache.
+
         Parameters
         ----------
         name : str
@@ -29,6 +68,7 @@ class Location:
             Height of the location, ignored if loc is supplied
 
         """
+        self._loc = None
         self.get_location(name=name, loc=loc, lat=lat, lon=lon, height=height)
         self.set_timezone(tz=tz)
 
@@ -37,11 +77,34 @@ class Location:
     
     def __str__(self):
         ss = ''
-        for key, val in self.__dict__.items():
-            if key not in ['loc']:
-                ss += f"{key}: {val}\n"
+        for key in ['lat', 'lon', 'height', 'name', 'tz']:
+            ss += f"{key}: {getattr(self, key)}\n"
         return ss
 
+    @property
+    def lat(self):
+        return self._lat_deg * u.deg
+
+    @property
+    def lon(self):
+        return self._lon_deg * u.deg
+
+    @property
+    def height(self):
+        return self._height_m * u.m
+
+    @property
+    def loc(self):
+        if self._loc is None:
+            self._loc = get_earth_location(self._lat_deg, self._lon_deg, self._height_m)
+        return self._loc
+
+    @loc.setter
+    def loc(self, loc):
+        """Use the EarthLocation loc, with the coordinates taken from it."""
+        self.set_coord(lat=loc.lat, lon=loc.lon, height=loc.height)
+        self._loc = loc
+
     def set_timezone(self, tz):
         """
         Set the timezone.
@@ -68,8 +131,17 @@ class Location:
             unit = u.Unit(kwargs['unit']) if isinstance(kwargs['unit'], str) else kwargs['unit']
             del(kwargs['unit'])
         for coord, val in kwargs.items():
-            val = val if isinstance(val, u.Quantity) else float(val) * unit
-            setattr(self, coord, val)
+            attr, native_unit = COORD_UNITS[coord]
+            if isinstance(val, u.Quantity):
+                val = val.to_value(native_unit)
+            elif unit == native_unit:
+                val = float(val)
+            else:
+                val = (float(val) * unit).to_value(native_unit)
+            setattr(self, attr, val)
+        self._loc = None
+        if all(hasattr(self, attr) for attr, _ in COORD_UNITS.values()):  # Built now, so bad coordinates raise here
+            self._loc = get_earth_location(self._lat_deg, self._lon_deg, self._height_m)
 
     def get_location(self, name=None, loc=None, lat=None, lon=None, height=0.0, latlon_unit='deg', height_unit='m'):
         """
@@ -89,26 +161,21 @@ class Location:
             Height of the location, ignored if loc is supplied
 
         """
-        if isinstance(name, Location):
-            self.set_coord(lat=name.lat, lon=name.lon, height=name.height)
-            self.name = name.name
-            self.loc = name.loc
-            return
-
         if isinstance(name, str) and name.lower() in LOCATIONS:
-            loc =  LOCATIONS[name.lower()]
+            loc = LOCATIONS[name.lower()]
+        elif isinstance(name, Location):
+            loc = name
 
-        if isinstance(loc, EarthLocation):
-            self.set_coord(lat=loc.lat, lon=loc.lon, height=loc.height)
-            self.name = name
-            self.loc = loc
+        handler = _object_handler(loc)
+        if handler is not None:
+            handler(self, loc, name)
             return
 
         # Now handle non-EarthLocation/Location
-        if loc is None and lat is None and isinstance(name, str):  # Given a stringified location in name
-            loc = json.loads(name)
-        elif isinstance(loc, str):  # Given a stringified location in loc
-            loc = json.loads(loc)
+        if isinstance(loc, str):  # Given a stringified location in loc
+            loc = _loads_location(loc)
+        elif loc is None and lat is None and isinstance(name, str):  # Given a stringified location in name
+            loc = _loads_location(name)
         elif isinstance(name, dict):  # Given a dictionary in name
             loc = name
         if isinstance(loc, dict):
@@ -118,9 +185,33 @@ class Location:
             name = loc['name']
         self.set_coord(lat=lat, lon=lon, unit=latlon_unit)
         self.set_coord(height=height, unit=height_unit)
-        self.loc = EarthLocation(lat=self.lat, lon=self.lon, height=self.height)
         self.name = name
 
+    def _from_location(self, other, name=None):
+        """Copy the coordinates from another Location (name is taken from it too)."""
+        self._lat_deg, self._lon_deg, self._height_m = other._lat_deg, other._lon_deg, other._height_m
+        self.name = other.name
+        self._loc = other._loc
+
+    def _from_earthlocation(self, loc, name=None):
+        """Use an EarthLocation directly."""
+        self.set_coord(lat=loc.lat, lon=loc.lon, height=loc.height)
+        self.name = name
+        self._loc = loc
+
     def stringify(self):
         return json.dumps({'name': self.name, 'tz': self.tz,
-                           'lat': self.lat.to_value('deg'), 'lon': self.lon.to_value('deg'), 'height': self.height.to_value('m')})
\ No newline at end of file
+                           'lat': self._lat_deg, 'lon': self._lon_deg, 'height': self._height_m})
+
+
+_OBJECT_HANDLERS = {Location: Location._from_location, EarthLocation: Location._from_earthlocation}
+
+
+def _object_handler(loc):
+    """Return the _OBJECT_HANDLERS entry for loc's type, or for the nearest base class it has one for (else None)."""
+    handler = _OBJECT_HANDLERS.get(type(loc))
+    if handler is None:
+        for cls in type(loc).__mro__[1:]:
+            if cls in _OBJECT_HANDLERS:
+                return _OBJECT_HANDLERS[cls]
+    return handler
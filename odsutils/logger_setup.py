@@ -3,6 +3,16 @@ import logging
 
 CONSOLE_HANDLER_NAME = 'Console'
 FILE_HANDLER_PREFIX = 'File_'
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S'
+_FORMATTER_CACHE = {}
+
+
+def get_formatter(fmt, datefmt=DATE_FORMAT):
+    """Return a shared '{'-style Formatter for fmt/datefmt, creating it on first use."""
+    key = (fmt, datefmt)
+    if key not in _FORMATTER_CACHE:
+        _FORMATTER_CACHE[key] = logging.Formatter(fmt, style='{', datefmt=datefmt)
+    return _FORMATTER_CACHE[key]
 
 
 class Logger:
@@ -15,19 +25,19 @@ class Logger:
         self.log_filename = log_filename
         file_handler_name = f"{FILE_HANDLER_PREFIX}{log_filename}"
         self.path = '' if path is None else path
-        self.handler_names = [x.get_name() for x in logger.handlers]
+        self.handler_names = {x.get_name() for x in logger.handlers}
         if CONSOLE_HANDLER_NAME not in self.handler_names and isinstance(conlog, str):
             from sys import stdout
             console_handler = logging.StreamHandler(stdout)
             console_handler.setLevel(self.conlog)
-            console_handler.setFormatter(logging.Formatter(conlog_format, style='{', datefmt='%Y-%m-%dT%H:%M:%S'))
+            console_handler.setFormatter(get_formatter(conlog_format))
             console_handler.set_name(CONSOLE_HANDLER_NAME)
             logger.addHandler(console_handler)
         if file_handler_name not in self.handler_names and isinstance(filelog, str):
             import os.path as op
             file_handler = logging.FileHandler(op.join(path, log_filename), mode='a')
             file_handler.setLevel(self.filelog)
-            file_handler.setFormatter(logging.Formatter(filelog_format, style='{', datefmt='%Y-%m-%dT%H:%M:%S'))
+            file_handler.setFormatter(get_formatter(filelog_format))
             file_handler.set_name(file_handler_name)
             logger.addHandler(file_handler)
 
@@ -1,8 +1,7 @@
-from . import ods_tools as tools
 from . import ods_timetools as timetools
 from . import logger_setup, __version__
-from astropy.time import TimeDelta
 from datetime import datetime, timedelta
+from weakref import WeakKeyDictionary
 import logging
 from . import LOG_FILENAME, LOG_FORMATS
 
@@ -32,6 +31,7 @@ class ODSCheck:
                                                 filelog_format=LOG_FORMATS['filelog_format'], conlog_format=LOG_FORMATS['conlog_format'])
         logger.info(f"{__name__} ver. {__version__}")
         self.standard = standard
+        self._dedup_index = WeakKeyDictionary()  # Keyed on the ODS instance, so dropped along with it
 
     def change_standard(self, standard):
         self.standard = standard
@@ -75,16 +75,51 @@ class ODSCheck:
             ODS Instance to check
         record : dict
             Reord to check
+        fields2check : str or list
+            Fields to compare, 'all' uses the standard ods_fields
 
         Return
         ------
         bool : True if the record is already in ODS Instance
 
         """
+        if fields2check == 'all':
+            fields2check = ods.standard.ods_fields
+        fields2check = tuple(fields2check)
+        try:
+            probe = tuple(str(record[key]) for key in fields2check)
+        except KeyError:  # Doesn't check across standards.
+            return False
+        return probe in self._build_dedup_index(ods, fields2check)
+
+    def _build_dedup_index(self, ods, fields2check):
+        """
+        Return the set of field-value tuples of the ods entries, rebuilt only when the entries change.
+
+        Parameters
+        ----------
+        ods : ODS Instance
+            ODS Instance to index
+        fields2check : tuple
+            Fields making up the key
+
+        Return
+        ------
+        set of tuples of str
+
+        """
+        fingerprint = (id(ods.entries), len(ods.entries), getattr(ods, '_edits', None), fields2check)
+        cached = self._dedup_index.get(ods)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        index = set()
         for entry in ods.entries:
-            if self.is_same(entry, record, fields2check==fields2check, standard=ods.standard):
-                return True
-        return False
+            try:
+                index.add(tuple(str(entry[key]) for key in fields2check))
+            except KeyError:
+                continue
+        self._dedup_index[ods] = (fingerprint, index)
+        return index
 
     def observation(self, rec, el_lim_deg=10.0, dt_sec=120.0, show_plot=False, standard=None):
         """
@@ -109,23 +144,19 @@ class ODSCheck:
             False if never above the horizon, otherwise a tuple containing the limiting times within the record span.
 
         """
-        from astropy.coordinates import EarthLocation, AltAz, SkyCoord
+        from astropy.coordinates import AltAz, SkyCoord
         import astropy.units as u
         from numpy import where
+        from .locations import get_earth_location
 
         standard = self.standard if standard is None else standard
-        start = timetools.interpret_date(rec[standard.start], fmt='Time')
-        stop = timetools.interpret_date(rec[standard.stop], fmt='Time')
-        dt = TimeDelta(dt_sec, format='sec')
-        times = []
-        this_step = start
-        while(this_step < stop):
-            times.append(this_step)
-            this_step += dt
-        if not len(times):
-            return times
-        times = timetools.interpret_date(times, fmt='Time')
-        location = EarthLocation(lat = float(rec[standard.lat]) * u.deg, lon = float(rec[standard.lon]) * u.deg, height = float(rec[standard.ele]) * u.m)
+        start = timetools._interpret_date_shared(rec[standard.start], fmt='Time')
+        stop = timetools._interpret_date_shared(rec[standard.stop], fmt='Time')
+        steps = _time_steps(start, stop, dt_sec)
+        if not len(steps):
+            return []
+        times = start + timetools.TimeDelta(steps, format='sec')
+        location = get_earth_location(float(rec[standard.lat]), float(rec[standard.lon]), float(rec[standard.ele]))
 
         aa = AltAz(location=location, obstime=times)
         coord = SkyCoord(float(rec[standard.ra]) * u.deg, float(rec[standard.dec]) * u.deg)
@@ -141,6 +172,66 @@ class ODSCheck:
             plt.plot(times.datetime, obs.alt, label=rec[standard.source])
         return (times[above_horizon[0]].datetime.isoformat(timespec='seconds'), times[above_horizon[-1]].datetime.isoformat(timespec='seconds'))
     
+    def observations(self, recs, el_lim_deg=10.0, dt_sec=120.0, standard=None):
+        """
+        Same as observation for a list of records, with the ephemerides of all records at a site in one transform.
+
+        Parameters
+        ----------
+        recs : list of dict
+            ODS records
+        el_lim_deg : float
+            Elevation limit that represents "above the horizon"
+        dt_sec : float
+            Time step for ephemerides check.
+        standard : Standard or None
+            Standard to use
+
+        Return
+        ------
+        list
+            The observation return for each record (tuple of limiting times, False or [])
+
+        """
+        from astropy.coordinates import AltAz, SkyCoord
+        import astropy.units as u
+        from numpy import arange, array, concatenate, cumsum, flatnonzero, repeat
+        from .locations import get_earth_location
+
+        standard = self.standard if standard is None else standard
+        results = [[] for _ in recs]
+        sites = {}
+        for i, rec in enumerate(recs):
+            start = timetools._interpret_date_shared(rec[standard.start], fmt='Time')
+            stop = timetools._interpret_date_shared(rec[standard.stop], fmt='Time')
+            steps = _time_steps(start, stop, dt_sec)
+            if len(steps):
+                site = (float(rec[standard.lat]), float(rec[standard.lon]), float(rec[standard.ele]))
+                sites.setdefault(site, []).append((i, start, steps))
+        for site, site_recs in sites.items():
+            index, starts, steps = zip(*site_recs)
+            counts = [len(these) for these in steps]
+            bounds = cumsum([0] + counts)
+            rec_of_sample = repeat(arange(len(index)), counts)  # Which record each time sample belongs to
+            times = timetools.Time(list(starts))[rec_of_sample] + timetools.TimeDelta(concatenate(steps), format='sec')
+            ra = array([float(recs[i][standard.ra]) for i in index])[rec_of_sample]
+            dec = array([float(recs[i][standard.dec]) for i in index])[rec_of_sample]
+            aa = AltAz(location=get_earth_location(*site), obstime=times)
+            above_horizon = SkyCoord(ra * u.deg, dec * u.deg).transform_to(aa).alt > el_lim_deg * u.deg
+            limits, observed = [], []
+            for j, i in enumerate(index):
+                above = flatnonzero(above_horizon[bounds[j]:bounds[j+1]])
+                if len(above):
+                    limits += [bounds[j] + above[0], bounds[j] + above[-1]]
+                    observed.append(i)
+                else:
+                    results[i] = False
+            if observed:
+                isots = [dt.isoformat(timespec='seconds') for dt in times[limits].datetime]
+                for k, i in enumerate(observed):
+                    results[i] = (isots[2 * k], isots[2 * k + 1])
+        return results
+
     def continuity(self, ods, time_offset_sec=1, adjust='stop'):
         """
         Check whether records overlap.
@@ -149,8 +240,8 @@ class ODSCheck:
 
         Parameters
         ----------
-        ods : list
-            ODS list of records
+        ods : ODS Instance
+            ODS Instance to check
         time_offset_sec : float
             Time used to offset overlapping entries
         adjust : str
@@ -161,22 +252,34 @@ class ODSCheck:
         Adjusted ODS list of records
 
         """
+        from copy import copy
+        from numpy import flatnonzero
+
         if adjust not in ['start', 'stop']:
             logger.warning(f'Invalid adjust spec - {adjust}')
-            return ods
-        adjusted_entries = tools.sort_entries(ods, [ods.standard.start, ods.standard.stop])
-        for i in range(len(adjusted_entries) - 1):
-            this_stop = timetools.interpret_date(adjusted_entries[i][ods.standard.stop], fmt='Time')
-            next_start = timetools.interpret_date(adjusted_entries[i+1][ods.standard.start], fmt='Time')
-            if next_start < this_stop:  # Need to adjust
-                if adjust == 'start':
-                    next_start = this_stop + TimeDelta(time_offset_sec, format='sec')
-                elif adjust == 'stop':
-                    this_stop = next_start - TimeDelta(time_offset_sec, format='sec')
-                adjusted_entries[i].update({ods.standard.stop: this_stop.datetime.isoformat()})
-                adjusted_entries[i+1].update({ods.standard.start: next_start.datetime.isoformat()})
-                if next_start < this_stop:
-                    logger.warning(f"{self.pre}New start is before stop so still need to fix.")
+            return ods.entries
+        start_key, stop_key = ods.standard.start, ods.standard.stop
+        adjusted_entries = ods.sorted_entries([start_key, stop_key])
+        if len(adjusted_entries) < 2:
+            return adjusted_entries
+        # Parse all times once -- adjusting one pair never changes the next comparison, so the overlaps can be found up front.
+        starts = timetools.Time([timetools._interpret_date_shared(entry[start_key], fmt='Time') for entry in adjusted_entries])
+        stops = timetools.Time([timetools._interpret_date_shared(entry[stop_key], fmt='Time') for entry in adjusted_entries])
+        offset = timetools.TimeDelta(time_offset_sec, format='sec')
+        copied = set()
+        for i in flatnonzero(starts[1:] < stops[:-1]):  # Need to adjust
+            for j in {i, i+1} - copied:  # sorted_entries hands back the instance's own records -- adjust copies
+                adjusted_entries[j] = copy(adjusted_entries[j])
+                copied.add(j)
+            this_stop, next_start = stops[i], starts[i+1]
+            if adjust == 'start':
+                next_start = this_stop + offset
+            elif adjust == 'stop':
+                this_stop = next_start - offset
+            adjusted_entries[i][stop_key] = this_stop
+            adjusted_entries[i+1][start_key] = next_start
+            if next_start < this_stop:
+                logger.warning("New start is before stop so still need to fix.")
         return adjusted_entries
 
     def coverage(self, ods):
@@ -193,12 +296,9 @@ class ODSCheck:
         float : fraction of time covered
 
         """
-        from copy import copy
-
-        sorted_entries = tools.sort_entries(ods.entries, [ods.standard.stop, ods.standard.start])
-        times = []
-        for entry in sorted_entries:
-            times.append([entry[ods.standard.start].datetime, entry[ods.standard.stop].datetime])
+        start_key, stop_key = ods.standard.start, ods.standard.stop
+        sorted_entries = ods.sorted_entries([stop_key, start_key])
+        times = [[entry[start_key].datetime, entry[stop_key].datetime] for entry in sorted_entries]
         merged = merge_intervals(times)
         total_duration = timedelta(0)
         for start, end in merged:
@@ -208,19 +308,46 @@ class ODSCheck:
         return total_duration, merged
 
     def read_log_file(self, fname, tformat='%Y-%m-%d %H:%M:%S'):
+        import mmap
+        import numpy as np
+        import pandas as pd
+
         self.log_fname = fname
         self.log_data = {}
-        with open(fname, 'r') as fp:
-            for line in fp:
-                if line.startswith('#'):
+        with open(fname, 'rb') as fp:
+            try:
+                mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Empty file
+                return
+        lines, times, msgs = [], [], []
+        with mm:
+            # Locate line ends and the first comma of each line with byte scans over the mapped file.
+            buf = np.frombuffer(mm, dtype=np.uint8)
+            line_stops = np.flatnonzero(buf == ord('\n'))
+            if not len(line_stops) or line_stops[-1] != len(buf) - 1:
+                line_stops = np.append(line_stops, len(buf))
+            line_starts = np.concatenate(([0], line_stops[:-1] + 1))
+            commas = np.append(np.flatnonzero(buf == ord(',')), len(buf))
+            first_commas = commas[np.searchsorted(commas, line_starts)]
+            is_comment = buf[line_starts] == ord('#')
+            del buf  # Release the export so the map can close
+            for start, stop, comma, comment in zip(line_starts.tolist(), line_stops.tolist(), first_commas.tolist(), is_comment.tolist()):
+                if comment:
+                    continue
+                line = mm[start:stop].decode().strip()
+                if comma >= stop:
+                    print(f"Invalid line in log file: {line}")
                     continue
-                try:
-                    time, msg = line.strip().split(',', 1)
-                    time = datetime.strptime(time, tformat)
-                    self.log_data[time] = msg
-                except ValueError:
-                    print(f"Invalid line in log file: {line.strip()}")
-                    pass
+                lines.append(line)
+                times.append(mm[start:comma].decode().lstrip())
+                msgs.append(mm[comma+1:stop].decode().rstrip())
+        # Parse all timestamps in one call (with a cache for repeated values) rather than strptime per line.
+        parsed = pd.to_datetime(pd.Series(times, dtype=object), format=tformat, errors='coerce', cache=True)
+        for line, time, msg in zip(lines, parsed, msgs):
+            if pd.isna(time):
+                print(f"Invalid line in log file: {line}")
+                continue
+            self.log_data[time.to_pydatetime()] = msg
 
 
 def merge_intervals(intervals):
@@ -228,30 +355,37 @@ def merge_intervals(intervals):
     Merge overlapping intervals from a list of datetime tuples.
 
     Args:
-        intervals (list of tuple): Each tuple is (start, end) where start and end are datetime objects.
+        intervals (list of tuple): Each tuple is (start, end) where start and end are datetime objects (or numbers).
 
     Returns:
         list of tuple: A list of merged intervals, each represented as (start, end).
     """
-    if not intervals:
+    if not len(intervals):
         return []
-    
-    # Sort intervals by their start times.
-    intervals_sorted = sorted(intervals, key=lambda x: x[0])
-    merged = []
-    
-    # Initialize the current interval to the first interval in the sorted list.
-    current_start, current_end = intervals_sorted[0]
-    
-    for start, end in intervals_sorted[1:]:
-        if start <= current_end:
-            # Overlapping intervals: extend the current interval if necessary.
-            current_end = max(current_end, end)
-        else:
-            # No overlap: add the current interval and start a new one.
-            merged.append((current_start, current_end))
-            current_start, current_end = start, end
-    
-    # Append the last interval.
-    merged.append((current_start, current_end))
-    return merged
+    from numpy import asarray, argsort, maximum, concatenate, flatnonzero
+
+    # Sort by start, then a running max of the ends gives each interval's merged end so far -- a new
+    # merged interval begins wherever a start is past everything before it.
+    as_datetime = isinstance(intervals[0][0], datetime)
+    arr = asarray(intervals, dtype='datetime64[us]' if as_datetime else None)
+    order = argsort(arr[:, 0], kind='stable')
+    starts = arr[order, 0]
+    ends = maximum.accumulate(arr[order, 1])
+    first = flatnonzero(concatenate(([True], starts[1:] > ends[:-1])))
+    last = concatenate((first[1:] - 1, [len(starts) - 1]))
+    return list(zip(starts[first].tolist(), ends[last].tolist()))
+
+
+def _time_steps(start, stop, dt_sec):
+    """
+    Offsets (sec) from start of the ephemeris samples start, start + dt_sec, ... within the record.
+
+    The stop itself is a sample when the span is a whole number of steps (to within a microsecond) -- the old
+    loop adding TimeDeltas one at a time usually ended that way too, but only through its rounding.
+
+    """
+    from numpy import arange, floor
+    span = (stop - start).sec
+    if span <= 0.0:
+        return arange(0.0)
+    return arange(int(floor((span + 1e-6) / dt_sec)) + 1) * float(dt_sec)
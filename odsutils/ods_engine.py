@@ -1,4 +1,6 @@
-from copy import copy
+from itertools import groupby
+from contextlib import contextmanager
+from types import MappingProxyType
 from .ods_check import ODSCheck
 from . import ods_instance, logger_setup, __version__
 from . import ods_tools as tools
@@ -55,7 +57,7 @@ class ODS:
         # ###
         self.version = version
         self.ods = {}
-        self.defaults = {}
+        self.defaults = MappingProxyType({})
         self._flag_generate_instance_report = True
         self.new_ods_instance(working_instance, version=version, set_as_working=True)
         self.check = ODSCheck(alert=self.log_settings.conlog, standard=self.ods[working_instance].standard)
@@ -102,12 +104,14 @@ class ODS:
             If not None, use this instance to initialize the assembled ODS.
             
         """
-        from glob import glob
+        import os
 
         if directory.endswith('json'):
             directory = op.dirname(directory)
         assembly_instance_name = 'assembly'
-        ods_files = glob(op.join(directory, 'ods_*.json'))
+        with os.scandir(directory or '.') as dir_entries:  # Same as glob 'ods_*.json', without the per-name fnmatch
+            ods_files = [op.join(directory, entry.name) for entry in dir_entries
+                         if entry.name.startswith('ods_') and entry.name.endswith('.json')]
         logger.info(f"Found {len(ods_files)} ODS files in {directory}.")
         self.new_ods_instance(instance_name=assembly_instance_name)
         if initial_instance is not None:
@@ -115,10 +119,18 @@ class ODS:
                 self.merge(from_ods=initial_instance, to_ods=assembly_instance_name)
             else:
                 logger.warning(f"Initial instance {initial_instance} not found -- starting with empty ODS.")
-        for ods_file in ods_files:
+        # Read/parse the files concurrently, then add and merge them in order here
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(len(ods_files), os.cpu_count() or 1) or 1) as executor:
+            ods_inputs = list(executor.map(tools.read_json_file, ods_files))
+        for ods_file, ods_input in zip(ods_files, ods_inputs):
             self.new_ods_instance(instance_name=ods_file)
-            self.add(ods_file, instance_name=ods_file)
-            self.merge(from_ods=ods_file, to_ods=assembly_instance_name)
+            data_key = self.ods[ods_file].standard.data_key
+            if isinstance(ods_input, dict) and data_key in ods_input:
+                ods_input = ods_input[data_key]
+            self.add(ods_input, instance_name=ods_file, remove_duplicates=False)
+            with self._deferred_instance_report():  # The assembly is culled and summarized once, below
+                self.merge(from_ods=ods_file, to_ods=assembly_instance_name, remove_duplicates=False)
 
         self.cull_by_time('now', 'stale', instance_name=assembly_instance_name)
         self.cull_by_duplicate(instance_name=assembly_instance_name)
@@ -228,19 +240,18 @@ class ODS:
         self.new_ods_instance('__defaults__', version=version, set_as_working=False, overwrite=True)
         if defaults is None:
             return
-        elif defaults.startswith('$'):
+        elif isinstance(defaults, str) and defaults.startswith('$'):
             from . import DATA_PATH
             defaults = op.join(DATA_PATH, defaults[1:])
-        elif defaults in SITES:
+        elif isinstance(defaults, str) and defaults in SITES:
             defaults = SITES[defaults]['defaults']
-        self._flag_generate_instance_report = False
-        self.add(defaults, instance_name='__defaults__', remove_duplicates=False)
-        self.ods['__defaults__'].gen_info()
-        self.defaults = copy(self.ods['__defaults__'].input_set_len_1)  # Cryptic, but means all entries with only one record in the set
+        with self._deferred_instance_report():
+            self.add(defaults, instance_name='__defaults__', remove_duplicates=False)
+        # Cryptic, but means all entries with only one record in the set.  Read-only, since it is shared by every new record.
+        self.defaults = MappingProxyType(self.ods['__defaults__'].input_set_len_1)
         logger.info(f"Default values from {defaults}:")
         for key, val in self.defaults.items():
             logger.info(f"\t{key:26s}  {val}")
-        self._flag_generate_instance_report = True
 
     def online_ods_monitor(self, url, logfile='online_ods_mon.txt', cols='all', sep=','):
         """
@@ -249,8 +260,8 @@ class ODS:
 
         Parameters
         ----------
-        url : str
-            URL of online ODS server
+        url : str or list of str
+            URL(s) of online ODS server(s) -- several are fetched concurrently
         logfile : str
             Local logfile to use.
         cols : str('all', csv-list) or list
@@ -259,8 +270,13 @@ class ODS:
             Separator to use in file.
 
         """
+        urls = [url] if isinstance(url, str) else list(url)
         self.new_ods_instance('from_web')
-        self.add(url, instance_name='from_web')
+        data_key = self.ods['from_web'].standard.data_key
+        for ods_input in tools.get_urls(urls, fmt='json'):
+            if isinstance(ods_input, dict) and data_key in ods_input:
+                ods_input = ods_input[data_key]
+            self.add(ods_input, instance_name='from_web')  # Anything else goes to add as it is, as add(url) would
         self.cull_by_time(instance_name='from_web', cull_by='inactive')
 
         self.new_ods_instance('from_log')
@@ -282,16 +298,13 @@ class ODS:
                 logger.info("Not reading new ODS instance for check_active.")
                 return []
 
-        ctime = timetools.interpret_date(ctime, fmt='Time')
-        active = []
-        for i, entry in enumerate(self.ods[instance].entries):
-            if 'src_start_utc' in entry and 'src_end_utc' in entry:
-                try:
-                    if entry['src_start_utc'] <= ctime <= entry['src_end_utc']:
-                        active.append(i)
-                except TypeError:
-                    continue
-        return active
+        ctime = timetools._interpret_date_shared(ctime, fmt='Time').datetime64
+        inst = self.ods[instance]
+        order, sorted_starts = inst.time_order(inst.standard.start)
+        stops = inst.time_column(inst.standard.stop)
+        # Only entries that have started by ctime can be active -- they are the first n of the start order
+        started = order[:sorted_starts.searchsorted(ctime, side='right')]
+        return sorted(started[stops[started] >= ctime].tolist())
 
 
     ##############################################MODIFY#########################################
@@ -328,20 +341,25 @@ class ODS:
         instance_name : str, None
             Name of instance to use
         show_plot : bool
-            Flag to show a plot.
+            Flag to show a plot (the records are then checked one at a time).
 
         """
         instance_name = self.get_instance_name(instance_name)
         logger.info(f"Updating {instance_name} for el limit {el_lim_deg}")
+        inst = self.ods[instance_name]
+        start_key, stop_key = inst.standard.start, inst.standard.stop
+        if show_plot:
+            all_limits = [self.check.observation(rec, el_lim_deg=el_lim_deg, dt_sec=dt_sec, show_plot=True) for rec in inst.entries]
+        else:
+            all_limits = self.check.observations(inst.entries, el_lim_deg=el_lim_deg, dt_sec=dt_sec)
         updated_ods = []
-        for rec in self.ods[instance_name].entries:
-            time_limits = self.check.observation(rec, el_lim_deg=el_lim_deg, dt_sec=dt_sec, show_plot=show_plot)
+        for rec, time_limits in zip(inst.entries, all_limits):
             if time_limits and len(time_limits):
-                valid_rec = copy(rec)
-                valid_rec.update({self.ods[instance_name].standard.start: time_limits[0], self.ods[instance_name].standard.stop: time_limits[1]})
-                updated_ods.append(valid_rec)
-        self.ods[instance_name].entries = updated_ods
-        self.ods[instance_name].gen_info()
+                rec[start_key] = inst._dump(start_key, time_limits[0], fmt='InternalRepresentation')
+                rec[stop_key] = inst._dump(stop_key, time_limits[1], fmt='InternalRepresentation')
+                updated_ods.append(rec)
+        inst.entries = updated_ods
+        inst.gen_info()
         if show_plot:
             import matplotlib.pyplot as plt
             plt.figure(ods_instance.PLOT_AZEL)
@@ -392,8 +410,9 @@ class ODS:
 
         """
         instance_name = self.get_instance_name(instance_name)
+        inst = self.ods[instance_name]
         if times is not None:
-            if len(times) != self.ods[instance_name].number_of_records:
+            if len(times) != inst.number_of_records:
                 logger.warning("times list doesn't have the right number of entries")
                 return
         elif start is None or obs_len_sec is None:
@@ -401,16 +420,16 @@ class ODS:
             return
         else:
             if not isinstance(obs_len_sec, list):
-                obs_len_sec = [obs_len_sec] * self.ods[instance_name].number_of_records
-            elif len(obs_len_sec) != self.ods[instance_name].number_of_records:
+                obs_len_sec = [obs_len_sec] * inst.number_of_records
+            elif len(obs_len_sec) != inst.number_of_records:
                 logger.warning("obs_len_sec doesn't have the right number of entries")
                 return
             times = tools.generate_observation_times(start, obs_len_sec)
-        for i, tt in enumerate(times):
-            this_update = {self.ods[instance_name].standard.start: tt[0],
-                           self.ods[instance_name].standard.stop: tt[1]}
-            self.ods[instance_name].entries[i].update(this_update)
-        self.ods[instance_name].gen_info()
+        start_key, stop_key = inst.standard.start, inst.standard.stop
+        for entry, tt in zip(inst.entries, times):
+            entry[start_key] = tt[0]
+            entry[stop_key] = tt[1]
+        inst.gen_info()
 
     def cull_by_time(self, cull_time='now', cull_by='stale', instance_name=None):
         """
@@ -429,24 +448,21 @@ class ODS:
         if cull_by not in ['stale', 'inactive']:
             logger.warning(f"Invalid cull parameter: {cull_by}")
             return
+        from numpy import flatnonzero
+
         instance_name = self.get_instance_name(instance_name)
-        cull_time = timetools.interpret_date(cull_time, fmt='Time')
+        cull_time = timetools._interpret_date_shared(cull_time, fmt='Time')
         logger.info(f"Culling ODS for {cull_time} by {cull_by}")
-        culled_ods = []
-        for rec in self.ods[instance_name].entries:
-            stop_time = rec[self.ods[instance_name].standard.stop]
-            add_it = True
-            if cull_time > stop_time:
-                add_it = False
-            elif cull_by == 'inactive':
-                start_time = rec[self.ods[instance_name].standard.start]
-                if cull_time < start_time:
-                    add_it = False
-            if add_it:
-                culled_ods.append(rec)
-        self.ods[instance_name].entries = copy(culled_ods)
-        self.ods[instance_name].gen_info()
-        logger.info(f"retaining {len(self.ods[instance_name].entries)} of {self.ods[instance_name].number_of_records}")
+        ctime = cull_time.datetime64
+        inst = self.ods[instance_name]
+        entries = inst.entries
+        starting_number = len(entries)
+        keep = inst.time_column(inst.standard.stop) >= ctime
+        if cull_by == 'inactive':
+            keep &= inst.time_column(inst.standard.start) <= ctime
+        inst.entries = [entries[i] for i in flatnonzero(keep)]
+        inst.gen_info()
+        logger.info(f"retaining {inst.number_of_records} of {starting_number}")
 
     def cull_by_invalid(self,  instance_name=None):
         """
@@ -459,21 +475,20 @@ class ODS:
 
         """
         instance_name = self.get_instance_name(instance_name)
-        self.ods[instance_name].gen_info()
+        inst = self.ods[instance_name]
+        inst.gen_info()
         logger.info("Culling ODS for invalid records.")
-        if not len(self.ods[instance_name].valid_records):
+        starting_number = inst.number_of_records
+        if not len(inst.valid_records) or len(inst.valid_records) == starting_number:
             logger.info("retaining all.")
             return
-        starting_number = copy(self.ods[instance_name].number_of_records)
-        culled_ods = []
-        for irec in self.ods[instance_name].valid_records:
-            culled_ods.append(copy(self.ods[instance_name].entries[irec]))
-        self.ods[instance_name].entries = culled_ods
-        self.ods[instance_name].gen_info()
-        if not self.ods[instance_name].number_of_records:
+        entries = inst.entries
+        inst.entries = [entries[irec] for irec in inst.valid_records]
+        inst.gen_info(all_valid=True)  # The ones kept were just checked
+        if not inst.number_of_records:
             logger.warning("Retaining no records.")
         else:
-            logger.info(f"retaining {self.ods[instance_name].number_of_records} of {starting_number}")
+            logger.info(f"retaining {inst.number_of_records} of {starting_number}")
     
     def cull_by_duplicate(self, instance_name=None):
         """
@@ -482,13 +497,17 @@ class ODS:
         """
         instance_name = self.get_instance_name(instance_name)
         logger.info("Culling ODS for duplicates")
-        starting_number = len(self.ods[instance_name].entries)
-        self.ods[instance_name].sort()
-        if len(self.ods[instance_name].entries) == starting_number:
+        inst = self.ods[instance_name]
+        starting_number = len(inst.entries)
+        if inst._collapsed_count == starting_number:  # Nothing has changed since the last cull
             logger.info("retaining all.")
             return
-        self.ods[instance_name].gen_info()
-        logger.info(f"retaining {self.ods[instance_name].number_of_records} of {starting_number}")
+        inst.sort()  # Also regenerates the info, since sorting moves the record numbers
+        inst._collapsed_count = len(inst.entries)  # Not number_of_records, which would check every record now
+        if inst._collapsed_count == starting_number:
+            logger.info("retaining all.")
+            return
+        logger.info(f"retaining {inst._collapsed_count} of {starting_number}")
 
     def update_instance_meta(self, instance_name=None):
         """
@@ -535,29 +554,52 @@ class ODS:
         """
         if inp is None:  # Nothing will happen.
             return
-        instance_name = kwargs['instance_name'] if 'instance_name' in kwargs else None
+        # Resolve the instance once -- nested adds (list elements, file contents) get the resolved name
+        instance_name = self.get_instance_name(kwargs['instance_name'] if 'instance_name' in kwargs else None)
+        if instance_name is None:  # get_instance_name has logged the error
+            return
+        kwargs['instance_name'] = instance_name
+        info_is_current = False
         if isinstance(inp, dict):
-            self.new_record(**inp, instance_name=instance_name)
+            self.ods[instance_name].new_record(inp, defaults=self.defaults)
         elif isinstance(inp, list):
-            remove_duplicates = kwargs['remove_duplicates'] if 'remove_duplicates' in kwargs else True
-            self._flag_generate_instance_report = False
-            for rec in inp:
-                self.add(rec, **kwargs)
-            self._flag_generate_instance_report = True
-            if remove_duplicates:
-                self.cull_by_duplicate(instance_name=instance_name)
+            info_is_current = self._add_list(inp, **kwargs)
         elif isinstance(inp, str):
             self._add_from_file(inp, **kwargs)
         else:
             try:
-                data = vars(inp)
-                data.update({'instance_name': instance_name})
-                self.new_record(**data)
+                self.ods[instance_name].new_record(vars(inp), defaults=self.defaults)
             except:
                 logger.warning("Not a valid input type.")
                 return
         if self._flag_generate_instance_report:
-            self.update_instance_meta(instance_name=instance_name)
+            if info_is_current:
+                self.instance_report(instance_name=instance_name)
+            else:
+                self.update_instance_meta(instance_name=instance_name)
+
+    def _add_list(self, inp, instance_name, remove_duplicates=True, **kwargs):
+        """Add a list of records to the (already resolved) instance_name -- return True if culled by duplicate."""
+        with self._deferred_instance_report():
+            for is_dict, recs in groupby(inp, key=lambda x: isinstance(x, dict)):
+                if is_dict:  # Runs of plain records go in together
+                    self.ods[instance_name].new_records(recs, defaults=self.defaults)
+                else:
+                    for rec in recs:
+                        self.add(rec, instance_name=instance_name, remove_duplicates=remove_duplicates, **kwargs)
+        if remove_duplicates:
+            self.cull_by_duplicate(instance_name=instance_name)
+        return remove_duplicates
+
+    @contextmanager
+    def _deferred_instance_report(self):
+        """Hold off the per-add gen_info/instance report, restoring the previous setting so nested adds work."""
+        previous = self._flag_generate_instance_report
+        self._flag_generate_instance_report = False
+        try:
+            yield
+        finally:
+            self._flag_generate_instance_report = previous
 
     def merge(self, from_ods, to_ods=ods_instance.DEFAULT_WORKING_INSTANCE, remove_duplicates=True):
         """
@@ -574,9 +616,17 @@ class ODS:
 
         """
         logger.info(f"Updating {to_ods} from {from_ods}")
-        self.add(self.ods[from_ods].entries, instance_name=to_ods, remove_duplicates=remove_duplicates)
-
-    def _add_from_file(self, data_file_name, instance_name=None, sep='auto', replace_char=None, header_map=None, remove_duplicates=True):
+        entries = self.ods[from_ods].entries
+        if remove_duplicates and self.ods[to_ods].entries:  # Leave out records to_ods already has
+            terms = self.ods[to_ods].standard.sort_order_time
+            existing = set(tools.record_keys(self.ods[to_ods].entries, terms))
+            # Records missing a term (e.g. from another standard) are never taken as duplicates here
+            complete = [rec for rec in entries if all(term in rec for term in terms)]
+            dropped = {id(rec) for rec, key in zip(complete, tools.record_keys(complete, terms)) if key in existing}
+            entries = [rec for rec in entries if id(rec) not in dropped]
+        self.add(entries, instance_name=to_ods, remove_duplicates=remove_duplicates)
+
+    def _add_from_file(self, data_file_name, instance_name=None, sep='auto', replace_char=None, header_map=None, remove_duplicates=True, chunksize=None, engine=None):
         """
         Append new records from a json file or a data file assuming the first line is a header.
 
@@ -595,6 +645,10 @@ class ODS:
             replace column header names with those provided
             - str: read json file
             - dict: {<ods_header_name>: <datafile_header_name>}
+        chunksize : None or int
+            If int, read a data file in chunks of that many rows
+        engine : None or str
+            pandas.read_csv engine for data files (e.g. 'pyarrow'), see tools.read_data_file
 
         """
         instance_name = self.get_instance_name(instance_name)
@@ -604,11 +658,18 @@ class ODS:
         elif data_file_name.endswith('.json'):
             ods_input = tools.read_json_file(data_file_name)
         else:
-            obs_list = tools.read_data_file(data_file_name, sep=sep, replace_char=replace_char, header_map=header_map)
+            # Read text fields as str (e.g. so ids like '0123' survive); numeric fields are left to the validity check.
+            str_fields = {key: str for key, ftype in self.ods[instance_name].standard.ods_fields.items() if ftype is str}
+            obs_list = tools.read_data_file(data_file_name, sep=sep, replace_char=replace_char, header_map=header_map,
+                                            dtype=str_fields, chunksize=chunksize, engine=engine)
             ods_input = []
-            if obs_list:
-                for _, row in obs_list.iterrows():
-                    ods_input.append(row.to_dict())
+            if obs_list is not False:
+                try:
+                    for chunk in ([obs_list] if chunksize is None or engine == 'pyarrow' else obs_list):
+                        ods_input.extend(chunk.to_dict(orient='records'))
+                except ValueError:  # pandas.errors.ParserError, found part way through a chunked read
+                    print(f"Error parsing {data_file_name}")
+                    ods_input = []
         if isinstance(ods_input, dict) and self.ods[instance_name].standard.data_key in ods_input:
                 ods_input = ods_input[self.ods[instance_name].standard.data_key]               
         self.add(ods_input, instance_name=instance_name, remove_duplicates=remove_duplicates)
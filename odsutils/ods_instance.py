@@ -1,4 +1,7 @@
 from copy import copy
+from collections import Counter
+from itertools import chain
+from functools import lru_cache
 from .ods_standard import Standard
 from . import ods_tools as tools
 from . import ods_timetools as timetools
@@ -7,8 +10,19 @@ from . import ods_timetools as timetools
 DEFAULT_WORKING_INSTANCE = 'primary'
 PLOT_AZEL = 'Az vs El'
 PLOT_TIMEEL = 'Time vs El'
-REF_LATEST_TIME = timetools.interpret_date('now+10000h', fmt='Time')
-REF_EARLIEST_TIME = timetools.interpret_date('2020-01-01T00:00', fmt='Time')
+REF_TIMES = {'REF_LATEST_TIME': 'now+10000h', 'REF_EARLIEST_TIME': '2020-01-01T00:00'}
+
+
+@lru_cache(maxsize=None)
+def _ref_time(name):
+    """Make the REF_*_TIME references on first use -- 'now+...' pulls in the leap-second tables, which is slow."""
+    return timetools.interpret_date(REF_TIMES[name], fmt='Time')
+
+
+def __getattr__(name):
+    if name in REF_TIMES:
+        return _ref_time(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class ODSInstance:
@@ -27,10 +41,13 @@ class ODSInstance:
         self.instance_name = instance_name
         self.standard = Standard(version=version)
         self.entries = []
-        self.valid_records = []
-        self.invalid_records = {}
-        self.number_of_records = 0
-        self.input_sets = {'invalid': set()}
+        self._info = None  # valid/invalid_records, number_of_records, earliest, latest -- worked out on read
+        self._all_valid = False
+        self._input_sets = {'invalid': set()}  # Counter of values per field, kept current as records come and go
+        self._time_columns = {}
+        self._collapsed_count = None  # Number of entries when last sorted/collapsed by cull_by_duplicate
+        self._string_pool = {}  # Canonical copy of each string value seen in new_records
+        self._edits = 0  # Bumped whenever the entries change, so caches built from them can tell they are stale
 
     def __str__(self):
         return self.view()
@@ -49,15 +66,42 @@ class ODSInstance:
             Dictionary containing new fields.
 
         """
-        rec = {}
-        for key in self.standard.ods_fields:
-            val = None
-            if key in entry:
-                val = entry[key]
-            elif key in defaults:
-                val = defaults[key]
-            rec[key] = self._dump(key, val, fmt='InternalRepresentation')
-        self.entries.append(rec)
+        self.new_records([entry], defaults=defaults)
+
+    def new_records(self, entries, defaults={}):
+        """
+        Add a list of new records -- same as new_record for each, but with the per-record setup done once.
+
+        Parameter
+        ---------
+        entries : list of dict
+            Dictionaries containing the new fields.
+        defaults : dict or mapping
+            Default values -- only read, and only once for the whole list, so no merged copy is made per record
+
+        """
+        fields = self.standard.ods_fields
+        time_fields = [key for key in self.standard.time_fields if key in fields]
+        str_fields = [key for key, ftype in fields.items() if ftype is str and key not in time_fields]
+        base = {key: defaults.get(key) for key in fields}
+        pool = self._string_pool
+        new_entries = []
+        for entry in entries:
+            rec = {key: entry[key] if key in entry else base[key] for key in fields}
+            for key in str_fields:  # Share one copy of each repeated value (site, source, version...)
+                val = rec[key]
+                if type(val) is str:
+                    rec[key] = pool.setdefault(val, val)
+            new_entries.append(rec)
+        for key in time_fields:  # A column at a time, so the date strings are parsed together
+            for rec, val in zip(new_entries, timetools.interpret_dates_cached([rec[key] for rec in new_entries])):
+                rec[key] = val
+        self.entries.extend(new_entries)
+        self._edits += 1
+        self._count_inputs(new_entries)
+        self._collapsed_count = None
+        self._info = None
+        self._all_valid = False
 
     def update_entry(self, entry_num, entry_updates):
         """
@@ -81,15 +125,17 @@ class ODSInstance:
         ctr = 0
         if entry_updates == 'delete':
             ctr = len(self.entries[entry_num])
-            self.entries.pop(entry_num)
+            self._count_inputs([self.entries.pop(entry_num)], -1)
         elif isinstance(entry_updates, dict):
-            ctr = 0
-            for key, val in entry_updates.items():
-                if key in self.standard.ods_fields:
-                    self.entries[entry_num][key] = self._dump(key, val, fmt='InternalRepresentation')
-                    ctr += 1
+            updates = {key: self._dump(key, val, fmt='InternalRepresentation') for key, val in entry_updates.items() if key in self.standard.ods_fields}
+            entry = self.entries[entry_num]
+            self._count_inputs([{key: entry[key] for key in updates if key in entry}], -1)
+            entry.update(updates)
+            self._count_inputs([updates])
+            ctr = len(updates)
         if ctr:
-            self.gen_info()
+            self._edits += 1
+            self.gen_info(recount=False)  # input_sets were adjusted above
         return ctr
 
     def sort(self, keyorder='sort_order_time', collapse=True, reverse=False):
@@ -110,11 +156,117 @@ class ODSInstance:
             keyorder = self.standard.sort_order_time
         elif isinstance(keyorder, list):
             keyorder = tools.listify(keyorder)
-        self.entries = tools.sort_entries(self.entries, keyorder, collapse=collapse, reverse=reverse)
+        # The cached time columns are reordered along with the entries rather than rebuilt
+        columns = {key: self.time_column(key) for key in keyorder if key in self.standard.time_fields}
+        order = self._sort_order(keyorder, collapse=collapse, reverse=reverse)
+        keys = {key: self._time_keys(key) for key in columns}
+        if len(order) < len(self.entries):  # Take the collapsed duplicates off the counters rather than recount them all
+            kept = set(order)
+            self._count_inputs([entry for i, entry in enumerate(self.entries) if i not in kept], -1)
+        self.entries = [self.entries[i] for i in order]
+        self.gen_info(recount=False)  # Counts don't depend on the order
+        self._time_columns = {key: column[order] for key, column in columns.items()}
+        self._time_columns.update({('keys', key): [column[i] for i in order] for key, column in keys.items()})
+
+    def _sort_order(self, keyorder, collapse=False, reverse=False):
+        """Entry numbers in sorted order (as tools.sort_entries), with the time terms keyed from the cached columns."""
+        time_keys = {key: self._time_keys(key) for key in keyorder if key in self.standard.time_fields}
+        return tools.sort_order(tools.record_keys(self.entries, keyorder, columns=time_keys), collapse=collapse, reverse=reverse)
+
+    def sorted_entries(self, keyorder, collapse=False, reverse=False):
+        """
+        Return the entries in keyorder without re-ordering the instance (as tools.sort_entries, but with the
+        time terms keyed from the cached columns).
+
+        Parameters
+        ----------
+        keyorder : list
+            key order to sort on
+        collapse : bool
+            Flag to leave off unique position number term
+        reverse : bool
+            If True, will sort in reverse order
+
+        Return
+        ------
+        list of dict : the instance's own records, not copies
+
+        """
+        return [self.entries[i] for i in self._sort_order(keyorder, collapse=collapse, reverse=reverse)]
+
+    def _time_keys(self, key):
+        """String keys of a time field, made as tools.record_keys makes them and cached alongside time_column."""
+        keys = self._time_columns.get(('keys', key))
+        if keys is None or len(keys) != len(self.entries):
+            keys = self._time_columns[('keys', key)] = tools._key_column(self.entries, key)
+        return keys
+
+    def time_column(self, key):
+        """
+        Return a time field of all entries as one numpy datetime64 array (column-wise view of the entries).
+
+        Entries whose value is not a Time are NaT, so they compare False against everything.  The column is
+        cached until the next gen_info (or until the number of entries changes).
+
+        Parameter
+        ---------
+        key : str
+            Time field (e.g. standard.start)
+
+        Return
+        ------
+        numpy.ndarray of datetime64[ns]
+
+        """
+        from numpy import full, datetime64
+
+        column = self._time_columns.get(key)
+        if column is None or len(column) != len(self.entries):
+            values = [entry.get(key) for entry in self.entries]
+            is_time = [isinstance(val, timetools.Time) for val in values]
+            column = full(len(values), datetime64('NaT'), dtype='datetime64[ns]')
+            if any(is_time):
+                column[is_time] = timetools.Time([val for val, this in zip(values, is_time) if this]).datetime64
+            self._time_columns[key] = column
+        return column
+
+    def time_order(self, key):
+        """
+        Return the sort order of a time field along with the sorted column, cached alongside time_column.
+
+        Parameter
+        ---------
+        key : str
+            Time field (e.g. standard.start)
+
+        Return
+        ------
+        tuple of numpy.ndarray : (argsort indices, sorted datetime64 column)
 
-    def gen_info(self):
         """
-        Get some extra info on the instance.
+        from numpy import arange
+
+        column = self.time_column(key)
+        order = self._time_columns.get(('order', key))
+        if order is None or len(order[0]) != len(column):
+            if (column[1:] >= column[:-1]).all():  # Entries are usually kept sorted by start (see sort), so no argsort
+                order = (arange(len(column)), column)
+            else:
+                indices = column.argsort(kind='stable')
+                order = (indices, column[indices])
+            self._time_columns[('order', key)] = order
+        return order
+
+    def gen_info(self, recount=True, all_valid=False):
+        """
+        Mark the extra info on the instance out of date -- it is worked out again on the next read of any of it.
+
+        Parameters
+        ----------
+        recount : bool
+            If False, keep the input_sets counters (which the caller has kept current)
+        all_valid : bool
+            If True, the caller knows every entry is valid (e.g. just culled to the valid ones), so skip the checks
 
         Attributes
         ----------
@@ -122,43 +274,114 @@ class ODSInstance:
             List of valid record entry numbers
         invalid_record : dict
             Dict of invalid records, keyed on entry number
-        input_sets : set
-            List of input sets and invalid keys -- set in gen_info
+        input_sets : dict
+            Counter of the values of each field (time fields keyed by their isot string), and set of invalid keys
         number_of_records : int
-            Number of records (entries) -- set in gen_info
+            Number of records (entries)
         earliest : Time
             Time of earliest record
         latest : Time
             Time of latest record
 
         """
+        self._edits += 1
+        self._time_columns = {}
+        self._collapsed_count = None
+        self._info = None
+        self._all_valid = all_valid
+        if recount:
+            self._input_sets = None
+
+    def _get_info(self, attr):
+        """Return one of the gen_info attributes, working them all out first if they are out of date."""
+        if self._info is None:
+            info = {'number_of_records': len(self.entries), 'invalid_records': {}, 'valid_records': [],
+                    'earliest': _ref_time('REF_LATEST_TIME'), 'latest': _ref_time('REF_EARLIEST_TIME')}
+            valid = self.standard.valid
+            if self._all_valid:
+                info['valid_records'] = list(range(len(self.entries)))
+            else:
+                for ctr, entry in enumerate(self.entries):
+                    is_valid, msg = valid(entry)
+                    if is_valid:
+                        info['valid_records'].append(ctr)
+                    else:
+                        info['invalid_records'][ctr] = msg
+            # The time columns are built here (and kept for cull_by_time etc), so the extremes are one pass each
+            first = self._extreme_entry(self.standard.start, 'argmin')
+            if first is not None and first < info['earliest']:
+                info['earliest'] = copy(first)
+            last = self._extreme_entry(self.standard.stop, 'argmax')
+            if last is not None and last > info['latest']:
+                info['latest'] = copy(last)
+            self._info = info
+        return self._info[attr]
+
+    valid_records = property(lambda self: self._get_info('valid_records'))
+    invalid_records = property(lambda self: self._get_info('invalid_records'))
+    number_of_records = property(lambda self: self._get_info('number_of_records'))
+    earliest = property(lambda self: self._get_info('earliest'))
+    latest = property(lambda self: self._get_info('latest'))
+
+    @property
+    def input_sets(self):
+        if self._input_sets is None:
+            self._input_sets = {'invalid': set()}
+            self._count_inputs(self.entries)
+        if not self.entries:
+            return self._input_sets
+        # Time fields are counted on read from their cached columns (by the same string keys sorting uses), so adds
+        # never hash Time objects.  Keys in the standard's field order, as records are laid out by new_records.
+        input_sets, time_fields = {'invalid': self._input_sets['invalid']}, self.standard.time_fields
+        for key in self.standard.ods_fields:
+            if key in time_fields:
+                input_sets[key] = Counter(self._time_keys(key))
+            elif key in self._input_sets:
+                input_sets[key] = self._input_sets[key]
+        return input_sets
+
+    def _extreme_entry(self, key, which):
+        """Return the Time of key from the entry with the argmin/argmax of that time column, or None if there are none."""
+        from numpy import isnat, flatnonzero
+
+        column = self.time_column(key)
+        has_time = flatnonzero(~isnat(column))
+        if not len(has_time):
+            return None
+        return self.entries[has_time[getattr(column[has_time], which)()]][key]
+
+    def _count_inputs(self, entries, sign=1):
+        """
+        Add (sign=1) or remove (sign=-1) the values of entries from the input_sets counters.
 
-        self.earliest = REF_LATEST_TIME
-        self.latest = REF_EARLIEST_TIME
-        self.number_of_records = len(self.entries)
-        self.invalid_records = {}
-        self.valid_records = []
-        for ctr, entry in enumerate(self.entries):
-            for key, val in entry.items():
-                if key in self.standard.ods_fields:
-                    self.input_sets.setdefault(key, set())
-                    self.input_sets[key].add(val)
-                    if isinstance(entry[key], timetools.Time):
-                        if key == self.standard.start and entry[key] < self.earliest:
-                            self.earliest = copy(entry[key])
-                        elif key == self.standard.stop and entry[key] > self.latest:
-                            self.latest = copy(entry[key])
-                else:
-                    self.input_sets['invalid'].add(key)
-            is_valid, msg = self.standard.valid(entry)
-            if is_valid:
-                self.valid_records.append(ctr)
+        """
+        if self._input_sets is None:  # Out of date anyway -- recounted in full when next read
+            return
+        fields, time_fields, input_sets = self.standard.ods_fields, self.standard.time_fields, self._input_sets
+        for key in dict.fromkeys(chain.from_iterable(entries)):  # First-seen order; Counter.update/subtract loop in C
+            if key not in fields:
+                input_sets['invalid'].add(key)
+                continue
+            if key in time_fields:  # See input_sets
+                continue
+            values = [entry[key] for entry in entries if key in entry]
+            counts = input_sets.get(key)
+            if counts is None:
+                counts = input_sets[key] = Counter()
+            if sign > 0:
+                counts.update(values)
             else:
-                self.invalid_records[ctr] = msg
-        self.input_set_len_1 = {}
-        for key, val in self.input_sets.items():
-            if key != 'invalid' and len(val) == 1:
-                self.input_set_len_1[key] = list(val)[0]
+                counts.subtract(values)
+                for val in set(values):
+                    if counts[val] <= 0:
+                        del counts[val]
+
+    @property
+    def input_set_len_1(self):
+        """Fields that have only one value across all entries, with that value."""
+        time_fields = self.standard.time_fields
+        return {key: self.entries[0][key] if key in time_fields else next(iter(val))
+                for key, val in self.input_sets.items() if key != 'invalid' and len(val) == 1}
 
     def _dump(self, key, val, fmt='isoformat'):
         """
@@ -180,18 +403,13 @@ class ODSInstance:
         fmt = 'Time' if fmt == 'InternalRepresentation' else fmt
         fmt = 'isoformat' if fmt == 'ExternalFormat' else fmt
         if key == 'all':  # I probably don't need this anymore
-            if isinstance(val, list):
-                entries = []
-                for entry in val:
-                    entries.append(self._dump('all', entry, fmt=fmt))
-                return entries
-            elif isinstance(val, dict):
-                this_entry = {}
-                for tkey, tval in val.items():
-                    this_entry[tkey] = self._dump(tkey, tval, fmt=fmt)
-                return this_entry
+            if isinstance(val, (list, dict)):  # One flat pass, with fmt normalized once
+                time_fields, interpret = self.standard.time_fields, timetools._interpret_date_shared
+                entries = [{tkey: interpret(tval, fmt=fmt) if tkey in time_fields else tval for tkey, tval in entry.items()}
+                           for entry in (val if isinstance(val, list) else [val])]
+                return entries if isinstance(val, list) else entries[0]
         elif key in self.standard.time_fields:
-            return timetools.interpret_date(val, fmt=fmt)
+            return timetools._interpret_date_shared(val, fmt=fmt)
         else:
             return val
 
@@ -210,21 +428,46 @@ class ODSInstance:
         if not self.number_of_records:
             return
         from tabulate import tabulate
-        from numpy import ceil
-        blocks = [range(i * number_per_block, (i+1) * number_per_block) for i in range(int(ceil(self.number_of_records / number_per_block)))]
+        blocks = [range(i * number_per_block, (i+1) * number_per_block) for i in range(-(-self.number_of_records // number_per_block))]
         blocks[-1] = range(blocks[-1].start, self.number_of_records)
         order = order + [x for x in self.standard.ods_fields if x not in order]
-        full_table = ''
+        return ''.join(self._view_blocks(blocks, order, tabulate))
+
+    def _view_blocks(self, blocks, order, tabulate):
+        """Yield each tabulated block of view in turn."""
+        columns = {key: self._view_column(key) for key in order}
         for blk in blocks:
             header = ['Field    \\    #'] + [str(i) for i in blk]
-            data = []
-            for key in order:
-                row = [key] + [self._dump(key, self.entries[i].get(key, ''), fmt='isoformat') for i in blk]
-                data.append(row)
+            data = [[key] + [columns[key][i] for i in blk] for key in order]
             tble = tabulate(data, headers=header)
-            full_table += tble + '\n' + '=' * len(tble.splitlines()[1]) + '\n'
-        return full_table
-    
+            yield tble + '\n' + '=' * len(tble.splitlines()[1]) + '\n'
+
+    def _view_column(self, key):
+        """Display values of one field for all entries."""
+        if key in self.standard.time_fields:
+            return self._isoformat_column(key, missing='')
+        return [entry.get(key, '') for entry in self.entries]
+
+    def _isoformat_column(self, key, missing=None):
+        """A time field of all entries as _dump gives it for 'isoformat', from the cached column in one pass."""
+        from numpy import datetime_as_string, isnat, timedelta64
+
+        column = self.time_column(key)
+        # To the microsecond (as Time.datetime) then truncated to the second (as isoformat(timespec='seconds'))
+        isos = datetime_as_string((column + timedelta64(500, 'ns')).astype('datetime64[us]').astype('datetime64[s]'))
+        return [self._dump(key, entry.get(key, missing), fmt='isoformat') if nat else iso
+                for entry, nat, iso in zip(self.entries, isnat(column), isos)]
+
+    def _external_entries(self):
+        """Yield each entry as _dump('all', entry, fmt='ExternalFormat') would, with the time fields done a column at a time."""
+        time_columns = {key: self._isoformat_column(key) for key in self.standard.time_fields if key in self.standard.ods_fields}
+        for i, entry in enumerate(self.entries):
+            rec = dict(entry)
+            for key, column in time_columns.items():
+                if key in rec:
+                    rec[key] = column[i]
+            yield rec
+
     def graph(self, location='ATA', numpoints=160, numticks=10):
         """
         Text-based graph of ods times/targets sorted by start/stop times.
@@ -238,14 +481,13 @@ class ODSInstance:
 
         """
         from . import tgraph, locations
-        sorted_ods = tools.sort_entries(self.entries, [self.standard.start, self.standard.stop], collapse=False, reverse=False)
+        sorted_ods = self.sorted_entries([self.standard.start, self.standard.stop])
         loc = locations.Location(location)
         rowhdr = [[i, x['src_id']] for i, x in enumerate(sorted_ods)]
         graph = tgraph.Graph()
         graph.setup(self.earliest, duration_days=(self.latest - self.earliest).jd)
         graph.ticks_labels(tz=loc.tz, location=loc.loc, rowhdr=rowhdr, int_hr=2)
-        for entry in sorted_ods:
-            graph.row(entry['src_start_utc'], entry['src_end_utc'])
+        graph.add_rows([entry['src_start_utc'] for entry in sorted_ods], [entry['src_end_utc'] for entry in sorted_ods])
         graph.make_table()
         print(graph.tabulated)
 
@@ -259,8 +501,8 @@ class ODSInstance:
             Name of ods json file to write
 
         """
-        entries = self._dump('all', self.entries, fmt='ExternalFormat')
-        tools.write_json_file(file_name, {self.standard.data_key: entries})
+        entries = self._external_entries()  # Converted as written
+        tools.write_json_records(file_name, self.standard.data_key, entries)
 
     def export2file(self, filename, cols='all', sep=','):
         """
@@ -276,6 +518,6 @@ class ODSInstance:
             Separator to use
 
         """
-        entries = self._dump('all', self.entries, fmt='ExternalFormat')
+        entries = self._external_entries()  # Converted as written
         cols = list(self.standard.ods_fields.keys()) if cols == 'all' else tools.listify(cols)
         tools.write_data_file(filename, entries, cols, sep=sep)
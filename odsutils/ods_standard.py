@@ -151,6 +151,8 @@ class Standard:
         self.sort_order_time = self.standard.sort_order_time
         self.data_key = self.standard.meta_fields['data_key']
         self.time_fields = self.standard.meta_fields['time_fields']
+        # Fields whose type valid has to try -- str() takes anything, so those are never checked
+        self._typed_fields = [(key, ftype) for key, ftype in self.ods_fields.items() if ftype is not str]
         for key, val in self.standard.transfer_keys.items():
             setattr(self, key, val)
 
@@ -177,27 +179,33 @@ class Standard:
         """
         is_valid = True
         msg = []
-        for key in rec:  # check that all supplied keys are valid and not None
-            if key not in self.ods_fields:
+        ods_fields = self.ods_fields
+        for key, val in rec.items():  # check that all supplied keys are valid and not None
+            if key not in ods_fields:
                 msg.append(f"{key} not an ods_field")
                 is_valid = False
-            elif rec[key] is None:
+            elif val is None:
                 msg.append(f"Value for {key} is None")
                 is_valid = False
-        for key in self.ods_fields:  # Check that all keys are provided for a rec and type is correct
+        # Check that all keys are provided for a rec and type is correct -- all keys are there if none were flagged
+        checks = ods_fields.items() if len(rec) < len(ods_fields) or not is_valid else self._typed_fields
+        for key, ftype in checks:
             if key not in rec:
                 msg.append(f"Missing ODS field {key}")
                 is_valid = False
-            elif rec[key] is not None:
+                continue
+            val = rec[key]
+            if val is not None and type(val) is not ftype:
                 try:
-                    _ = self.ods_fields[key](rec[key])
+                    _ = ftype(val)
                 except ValueError:
-                    msg.append(f"{rec[key]} is wrong type for {key}")
+                    msg.append(f"{val} is wrong type for {key}")
                     is_valid = False
         for key in self.time_fields:
-            try:
-                _ = timetools.interpret_date(rec[key], fmt='Time')
-            except ValueError:
-                msg.append(f"{rec[key]} is not a valid astropy.time.Time input format")
-                is_valid = False
+            if not isinstance(rec.get(key), timetools.Time):
+                try:
+                    _ = timetools._interpret_date_shared(rec[key], fmt='Time')
+                except ValueError:
+                    msg.append(f"{rec[key]} is not a valid astropy.time.Time input format")
+                    is_valid = False
         return is_valid, msg
\ No newline at end of file
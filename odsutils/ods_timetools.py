@@ -1,6 +1,9 @@
 from astropy.time import Time, TimeDelta
 from zoneinfo import available_timezones, ZoneInfo, ZoneInfoNotFoundError
 from datetime import datetime, timedelta
+from functools import lru_cache
+import re
+import time as _time
 
 
 TUNITS = {'day': 24.0 * 3600.0, 'd': 24.0 * 3600.0,
@@ -13,6 +16,9 @@ NAMED_TIMES = {'now': 0.0, 'current': 0.0, 'today': 0.0,
                'tomorrow': 24.0*3600.0}
 
 
+_OFFSET_RE = re.compile(r'^[^+-]*([+-])\s*(\d+\.?\d*|\.\d+)\s*([a-z]+)\s*$')
+
+
 def check_named_times(iddate):
     """
     Check if iddate is a named time and return the corresponding dictionary with name, start time, and offset.
@@ -26,6 +32,10 @@ def check_named_times(iddate):
     return False
 
 def get_extra_offset(iddate):
+    match = _OFFSET_RE.match(iddate)
+    if match and match.group(3) in TUNITS:  # The usual single '<sign><number><unit>' form, e.g. 'now+2h'
+        direction = 1.0 if match.group(1) == '+' else -1.0
+        return TimeDelta(float(match.group(2)) * direction * TUNITS[match.group(3)], format='sec')
     extra = iddate.split('+') if '+' in iddate else iddate.split('-')
     if len(extra) == 1:
         raise ValueError("Time offset must have a number and a time unit (e.g. '+2h', '-30m', '+15s'). ")
@@ -40,16 +50,19 @@ def get_extra_offset(iddate):
     raise ValueError("Time offset must have a number and a time unit (e.g. '+2h', '-30m', '+15s'). ")
 
 
+@lru_cache(maxsize=1)
 def all_timezones():
     """
     Return 2 dictionaries, e.g.:
     1 - timezones['US/Pacific'] = ['PST', 'PDT]
     2 - tz_offsets['PST'] = [-8.0, -8.0...]  # they should all be the same...
 
+    Built once and cached, so treat them as read-only.
+
     """
     timezones = {}
     tz_offsets = {}
-    for tz_iana in available_timezones():
+    for tz_iana in sorted(available_timezones()):  # Sorted so the order of each offsets list is always the same
         try:
             this_tz = ZoneInfo(tz_iana)
             #
@@ -124,6 +137,10 @@ def interpret_date(iddate, fmt='Time', NoneReturn=None):
     """
     if iddate is None:
         return None if NoneReturn is None else interpret_date(NoneReturn, fmt=fmt)
+    if isinstance(iddate, Time):  # Already parsed -- skip straight to the output format
+        return _format_time(iddate, fmt)
+    if fmt == 'datetime' and isinstance(iddate, datetime) and iddate.tzinfo is None:  # Time would hand it back as is
+        return iddate
     try:
         val = float(iddate)
         if fmt not in TUNITS:
@@ -132,8 +149,8 @@ def interpret_date(iddate, fmt='Time', NoneReturn=None):
     except:
         pass
 
-    if isinstance(iddate, list):
-        iddate = [interpret_date(x, fmt=fmt, NoneReturn=NoneReturn) for x in iddate]
+    if isinstance(iddate, list):  # Elements through the cache -- lists tend to repeat values (e.g. shared stops/starts)
+        iddate = [_interpret_date_shared(x, fmt=fmt, NoneReturn=NoneReturn) for x in iddate]
         if fmt == 'Time':
             iddate = Time(iddate)
         return iddate
@@ -152,7 +169,11 @@ def interpret_date(iddate, fmt='Time', NoneReturn=None):
             iddate = Time(iddate)
         except ValueError:
             return NoneReturn
-        
+    return _format_time(iddate, fmt)
+
+
+def _format_time(iddate, fmt):
+    """Return the Time iddate in the interpret_date output format fmt."""
     if fmt[0] == '%':
         iddate = iddate.datetime.strftime(fmt)
     elif fmt == 'datetime':
@@ -163,6 +184,77 @@ def interpret_date(iddate, fmt='Time', NoneReturn=None):
         iddate = iddate.jd
     return iddate
 
+@lru_cache(maxsize=4096)
+def _interpret_date_str(iddate, fmt):
+    return interpret_date(iddate, fmt=fmt)
+
+
+def interpret_date_cached(iddate, fmt='Time', NoneReturn=None):
+    """
+    Same as interpret_date, but results for date strings are cached.
+
+    Named times (e.g. 'now', 'today+2h') move with the clock, so they are only reused within the same
+    wall-clock second.  Non-string inputs are always re-evaluated.  A Time is handed back as a copy of the
+    cached one, so it may be changed in place.
+
+    """
+    iddate = _interpret_date_shared(iddate, fmt=fmt, NoneReturn=NoneReturn)
+    return iddate.copy() if isinstance(iddate, Time) else iddate
+
+
+def _interpret_date_shared(iddate, fmt='Time', NoneReturn=None):
+    """
+    interpret_date_cached without the copy -- a cached Time is the same object for every caller, so the
+    caller must not change it in place.
+
+    """
+    if isinstance(iddate, str) and NoneReturn is None:
+        if iddate.strip().lower().startswith(tuple(NAMED_TIMES)):
+            return _interpret_named_str(iddate, fmt, int(_time.time()))
+        return _interpret_date_str(iddate, fmt)
+    return interpret_date(iddate, fmt=fmt, NoneReturn=NoneReturn)
+
+
+def interpret_dates_cached(iddates):
+    """
+    Same as [interpret_date_cached(x) for x in iddates], but the plain date strings ('YYYY-MM-DD...') are
+    parsed together with one Time call rather than one Time per string.  Nothing is copied: equal strings
+    get the same Time object, also shared with the cache, so the returned Times must not be changed in place.
+
+    Parameter
+    ---------
+    iddates : list
+        Values to interpret, as for interpret_date
+
+    Return
+    ------
+    list of Time (or whatever interpret_date_cached returns for the other values)
+
+    """
+    times, batch = [None] * len(iddates), {}
+    for i, iddate in enumerate(iddates):
+        if isinstance(iddate, str) and len(iddate) > 7 and iddate[4] == '-' and iddate[:4].isdigit():
+            batch.setdefault(iddate, []).append(i)
+        else:
+            times[i] = _interpret_date_shared(iddate)
+    if batch:
+        strings = list(batch)
+        try:
+            parsed = Time(strings) if len(strings) > 1 else None
+        except ValueError:  # Mixed formats or a bad string -- sort them out one at a time
+            parsed = None
+        for j, iddate in enumerate(strings):
+            this_time = _interpret_date_shared(iddate) if parsed is None else parsed[j]
+            for i in batch[iddate]:
+                times[i] = this_time
+    return times
+
+
+@lru_cache(maxsize=64)
+def _interpret_named_str(iddate, fmt, second):
+    return interpret_date(iddate, fmt=fmt)
+
+
 def wait(target, verbose=True):
     """
     Pauses execution until the specified target time or length
@@ -1,5 +1,12 @@
 import json
+import threading
+from math import isfinite
 from . import ods_timetools as timetools
+try:
+    from orjson import loads as _loads, dumps as _dumps, OPT_INDENT_2, OPT_SERIALIZE_NUMPY
+except ImportError:
+    from json import loads as _loads
+    _dumps = None
 
 
 def read_json_file(file_name):
@@ -19,17 +26,33 @@ def read_json_file(file_name):
     if not file_name.endswith('.json'):
         file_name = file_name + '.json'
     try:
-        with open(file_name, 'r') as fp:
-            input_file = json.load(fp)
+        with open(file_name, 'rb') as fp:  # Parse straight from the bytes (orjson if available)
+            raw = fp.read()
     except FileNotFoundError:
         print(f"File not found:  {file_name}")
         return False
-    return input_file
+    try:
+        return _loads(raw)
+    except ValueError:  # orjson rejects the NaN/Infinity that json writes for non-finite floats
+        return json.loads(raw)
+
+
+def _has_nonfinite(obj):
+    """True if obj (nested dicts/lists) holds a NaN or infinite float -- orjson would write those as null."""
+    if isinstance(obj, float):
+        return not isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_nonfinite(val) for val in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_nonfinite(val) for val in obj)
+    return False
 
 
 def write_json_file(file_name, payload, indent=2):
     """
     Write a json file.
+
+    Non-finite floats are written as json does (NaN, Infinity), with or without orjson.
     
     Parameters
     ----------
@@ -41,11 +64,46 @@ def write_json_file(file_name, payload, indent=2):
         Indent to use.
 
     """
+    if _dumps is not None and indent == 2 and not _has_nonfinite(payload):  # orjson only does a 2-space indent
+        with open(file_name, 'wb') as fp:
+            fp.write(_dumps(payload, option=OPT_INDENT_2 | OPT_SERIALIZE_NUMPY))
+        return
     with open(file_name, 'w') as fp:
         json.dump(payload, fp, indent=indent)
 
 
-def read_data_file(file_name, sep='auto', replace_char=None, header_map=None):
+def write_json_records(file_name, data_key, records):
+    """
+    Write a json file of {data_key: records}, streaming the records one at a time.
+
+    The file is laid out as write_json_file would (NaN included), but (with orjson) only one record is serialized
+    at a time.
+
+    Parameters
+    ----------
+    file_name : str
+        Name of file to write.
+    data_key : str
+        Key of the record list
+    records : iterable of dict
+        Records to write.
+
+    """
+    if _dumps is None:
+        write_json_file(file_name, {data_key: list(records)})
+        return
+    option = OPT_INDENT_2 | OPT_SERIALIZE_NUMPY
+    with open(file_name, 'wb') as fp:
+        fp.write(_dumps({data_key: []}, option=option)[:-3])  # Up to the opening '[' -- drops the ']\n}' closing
+        sep = b'\n    '
+        for rec in records:
+            rec = json.dumps(rec, indent=2).encode() if _has_nonfinite(rec) else _dumps(rec, option=option)
+            fp.write(sep + rec.replace(b'\n', b'\n    '))  # Records sit two levels in
+            sep = b',\n    '
+        fp.write(b']\n}' if sep == b'\n    ' else b'\n  ]\n}')
+
+
+def read_data_file(file_name, sep='auto', replace_char=None, header_map=None, dtype=None, chunksize=None, engine=None):
     """
     Read a data file - assumes a header row.
     
@@ -61,10 +119,17 @@ def read_data_file(file_name, sep='auto', replace_char=None, header_map=None):
         Str will convert to list, then if list above or len == 1 {[0]: ''}
     header_map : None or dict
         If dict, will rename the header columns.
+    dtype : None or dict
+        Column types to read directly, keyed on the (renamed) column names -- columns not present are ignored.
+    chunksize : None or int
+        If int, return an iterator of DataFrames of that many rows instead of a single DataFrame.
+    engine : None or str
+        pandas.read_csv engine -- None uses 'c' ('python' for multi-character sep).  'pyarrow' (multi-threaded, if
+        installed) does not take chunksize and does not skip initial spaces, so text fields are stripped afterwards.
 
     Returns
     -------
-    pandas dataFrame
+    pandas dataFrame (or iterator of them if chunksize)
 
     """
     import pandas as pd
@@ -77,8 +142,33 @@ def read_data_file(file_name, sep='auto', replace_char=None, header_map=None):
                 sep = s
                 break
 
+    if replace_char is not None and not isinstance(replace_char, dict):
+        replace_char = listify(replace_char)
+        if len(replace_char) == 1:
+            replace_char.append('')
+        if len(replace_char) == 2:
+            replace_char = {replace_char[0]: replace_char[1]}
+        else:  # Not allowed.
+            replace_char = {}
+    if isinstance(header_map, str):
+        header_map = read_json_file(header_map)
+    if engine is None:
+        engine = 'c' if len(sep) == 1 else 'python'
+    options = {'chunksize': chunksize, 'skipinitialspace': True} if engine != 'pyarrow' else {}
     try:
-        data = pd.read_csv(file_name, sep=sep, skipinitialspace=True)
+        # The header first: dtype is given on the cleaned names and read_csv wants the file's.
+        header = pd.read_csv(file_name, sep=sep, nrows=0, engine='c' if len(sep) == 1 else 'python',
+                             skipinitialspace=engine != 'pyarrow').columns.tolist()
+        cleaned = _clean_header([col.strip() for col in header] if engine == 'pyarrow' else header, replace_char, header_map)
+        if dtype is not None:
+            dtype = {col: dtype[clean] for col, clean in zip(header, cleaned) if clean in dtype}
+        if engine != 'pyarrow':
+            # pandas lets extra fields through at the start of each chunk (and at the first row), so give them
+            # a column of their own and reject the file if it gets any -- the same for chunked or not.
+            options.update(names=header + [_EXTRA_FIELDS], header=None, skiprows=1)
+        data = pd.read_csv(file_name, sep=sep, dtype=dtype, engine=engine, **options)
+        if chunksize is None:
+            data = _check_fields(data)
     except FileNotFoundError:
         print(f"File not found: {file_name}")
         return False
@@ -86,32 +176,67 @@ def read_data_file(file_name, sep='auto', replace_char=None, header_map=None):
         print(f"Error parsing {file_name}")
         return False
 
-    if replace_char is not None:
-        if not isinstance(replace_char, dict):
-            replace_char = listify(replace_char)
-            if len(replace_char) == 1:
-                replace_char.append('')
-            if len(replace_char) == 2:
-                replace_char = {replace_char[0]: replace_char[1]}
-            else:  # Not allowed.
-                replace_char = {}
-        for key, val in replace_char.items():
-            data.columns = data.columns.str.replace(key, val)
-    if header_map is not None:
-        if isinstance(header_map, str):
-            header_map = read_json_file(header_map)
-        data = data.rename(header_map, axis='columns')
-
+    if engine == 'pyarrow':
+        for col in data.select_dtypes(include='object').columns:
+            data[col] = data[col].str.strip()
+    elif chunksize is not None:
+        return _relabel_chunks(data, cleaned)
+    data.columns = cleaned
     return data
 
 
+_EXTRA_FIELDS = '\x00extra'  # Column name no data file header will have
+
+
+def _check_fields(data):
+    """Raise ParserError if any row of data had more fields than the header, else drop the extra column."""
+    import pandas as pd
+
+    if data[_EXTRA_FIELDS].notna().any():
+        raise pd.errors.ParserError("A data row has more fields than the header")
+    return data.drop(columns=_EXTRA_FIELDS)
+
+
+def _relabel_chunks(chunks, header):
+    """
+    Yield the checked chunks with the cleaned header.
+
+    Raises pandas.errors.ParserError part way through if the file turns out to be malformed.
+
+    """
+    for chunk in chunks:
+        chunk = _check_fields(chunk)
+        chunk.columns = header
+        yield chunk
+
+
+def _clean_header(columns, replace_char, header_map):
+    """
+    Apply the header character replacements and renaming of read_data_file to the column names.
+
+    Single-character replacements go through one str.translate table, the renaming is a dict lookup.
+
+    """
+    columns = [str(col) for col in columns]
+    if replace_char:
+        if all(len(key) == 1 for key in replace_char):
+            table = str.maketrans(replace_char)
+            columns = [col.translate(table) for col in columns]
+        else:
+            for key, val in replace_char.items():
+                columns = [col.replace(key, val) for col in columns]
+    if header_map is not None:
+        columns = [header_map.get(col, col) for col in columns]
+    return columns
+
+
 def write_data_file(file_name, ods, cols, sep=','):
     """
     Parameters
     file_name : str
         Name of output file
-    ods : list of dict
-        List if dictionaries comprising ODS entries
+    ods : list (or iterable) of dict
+        List if dictionaries comprising ODS entries -- rows are written as they are produced
     cols : list or dict
         Columns to output
     sep : str
@@ -121,15 +246,28 @@ def write_data_file(file_name, ods, cols, sep=','):
     if sep == 'auto':
         sep = ','
     with open(file_name, 'w') as fp:
-        print(sep.join(cols), file=fp)
-        for rec in ods:
-            row = []
-            for key in cols:
-                row.append(str(rec[key]))
-            print(sep.join(row), file=fp)
+        fp.write(sep.join(cols) + '\n')
+        fp.writelines(sep.join([str(rec[key]) for key in cols]) + '\n' for rec in ods)
+
+
+_sessions = threading.local()
+
+
+def _shared_session():
+    """
+    One requests.Session per thread, so repeated reads (e.g. the online monitor) keep their connections.
 
+    requests doesn't promise a Session is safe to share across threads, so get_urls' workers each get their own.
 
-def get_url(url, fmt='json', timeout=8  ):
+    """
+    session = getattr(_sessions, 'session', None)
+    if session is None:
+        import requests
+        session = _sessions.session = requests.Session()
+    return session
+
+
+def get_url(url, fmt='json', timeout=8, session=None):
     """
     Read a json url.
 
@@ -137,16 +275,16 @@ def get_url(url, fmt='json', timeout=8  ):
     ---------
     url : str
         String with the URL.
+    session : requests.Session or None
+        Session to use -- None uses the one shared by get_url/get_urls calls in this thread
 
     Return
     ------
     dict : url json data
 
     """
-    import requests
-
     try:
-        xxx = requests.get(url, timeout=timeout)
+        xxx = (session or _shared_session()).get(url, timeout=timeout)
     except Exception as e:
         print(f"Error reading {url}:  {e}")
         return False
@@ -155,12 +293,39 @@ def get_url(url, fmt='json', timeout=8  ):
         if 'application/json' not in xxx.headers.get('Content-Type', ''):
             print(f"URL {url} did not return json data. ({xxx.headers.get('Content-Type', '')})")
             return {}
-        return xxx.json()
+        try:
+            return _loads(xxx.content)
+        except ValueError:  # NaN/Infinity (as write_json_file writes them) or not utf-8 -- orjson takes neither
+            return xxx.json()
     elif fmt == 'txt':
         return xxx.text.splitlines()
     else:
         raise ValueError(f"Invalid url return format: {fmt}")
 
+
+def get_urls(urls, fmt='json', timeout=8, max_workers=None):
+    """
+    Read several urls concurrently (see get_url), each worker thread over its own session.
+
+    Parameters
+    ----------
+    urls : list of str
+        The URLs to read
+    max_workers : int or None
+        Number of fetch threads (None for one per url)
+
+    Return
+    ------
+    list : data from each url, in the order of urls
+
+    """
+    if len(urls) < 2:
+        return [get_url(url, fmt=fmt, timeout=timeout) for url in urls]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max_workers or len(urls)) as executor:
+        return list(executor.map(lambda url: get_url(url, fmt=fmt, timeout=timeout), urls))
+
+
 def listify(x, d={}, sep=',', NoneReturn=[], dtype=None):
     """
     Convert input to list.
@@ -218,24 +383,76 @@ def sort_entries(ods, terms, collapse=False, reverse=False):
 
     Return
     ------
-    Sorted version of the input list.
+    Sorted version of the input list (the same record dicts, not copies).
 
     """
-    from copy import copy
+    return [ods[i] for i in sort_order(record_keys(ods, terms), collapse=collapse, reverse=reverse)]
+
+
+def sort_order(keys, collapse=False, reverse=False):
+    """
+    Return the record numbers in sorted order of their keys (see record_keys), as used by sort_entries.
+
+    Parameters
+    ----------
+    keys : list of tuple
+        Sort key of each record
+    collapse : bool
+        Flag to keep only the last record of each key
+    reverse : bool
+        Flag to reverse sort
+
+    Return
+    ------
+    list of int
 
-    entries = {}
-    for i, rec in enumerate(ods):
-        sort_key = []
-        for key in terms:
-            sort_key.append(str(rec[key]))
-        if not collapse:
-            sort_key.append(i)
-        sort_key = tuple(sort_key)
-        entries[sort_key] = i
-    adjusted_entries = []
-    for key in sorted(entries.keys(), reverse=reverse):
-        adjusted_entries.append(copy(ods[entries[key]]))
-    return adjusted_entries
+    """
+    if collapse:  # Single hashed pass to drop duplicates before sorting -- the last of each key is kept
+        order = list({sort_key: i for i, sort_key in enumerate(keys)}.values())
+    else:
+        order = list(range(len(keys)))
+    # Stable list.sort on the keys alone -- runs that are already in order (the usual case) cost O(N).
+    # Reversed afterwards rather than with reverse=True, so equal keys come out last record first.
+    order.sort(key=keys.__getitem__)
+    if reverse:
+        order.reverse()
+    return order
+
+
+def record_keys(ods, terms, columns={}):
+    """
+    Hashable key for each record -- the tuple of its terms as strings, as used to sort and find duplicates.
+
+    Parameters
+    ----------
+    ods : list of dict
+        A list of dictionaries with the records.
+    terms : list
+        The list of dictionary keys making up the key.
+    columns : dict
+        Already made string keys for some of the terms, {term: list of str}
+
+    Return
+    ------
+    list of tuple
+
+    """
+    return list(zip(*[columns[key] if key in columns else _key_column(ods, key) for key in terms]))
+
+
+def _key_column(ods, key):
+    """
+    String sort/dedup keys for one field of all records.
+
+    Times are formatted to isot in one vectorized call (str() on each Time is slow and depends on its format).
+
+    """
+    values = [rec[key] for rec in ods]
+    is_time = [isinstance(val, timetools.Time) for val in values]
+    if not any(is_time):
+        return [str(val) for val in values]
+    isots = iter(timetools.Time([val for val, this in zip(values, is_time) if this]).isot)
+    return [next(isots) if this else str(val) for val, this in zip(values, is_time)]
 
 
 def generate_observation_times(start, obs_len_sec, gap=1.0, N=None):
@@ -256,7 +473,6 @@ def generate_observation_times(start, obs_len_sec, gap=1.0, N=None):
     list : start/stop times
 
     """
-    from copy import copy
     from astropy.time import TimeDelta
     times = []
     start = timetools.interpret_date(start, fmt='Time')
@@ -265,6 +481,6 @@ def generate_observation_times(start, obs_len_sec, gap=1.0, N=None):
     current = start
     for obs in obs_len_sec:
         stop = current + TimeDelta(obs, format='sec')
-        times.append([copy(current), copy(stop)])
+        times.append([current, stop])  # Both are new Times (+ does not modify in place), so no copies needed
         current += TimeDelta(obs+gap, format='sec')
     return times
\ No newline at end of file
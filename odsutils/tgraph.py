@@ -3,8 +3,10 @@
 # Licensed under the MIT license.
 
 from astropy.time import Time, TimeDelta
-from datetime import datetime, timedelta
-from numpy import argmin, round, ceil, floor
+import astropy.units as u
+from datetime import datetime, timedelta, timezone
+from math import ceil, floor
+from numpy import argmin
 from odsutils import ods_timetools as timetools
 
 
@@ -13,13 +15,15 @@ DAYSEC = 24 * 3600
 SIDEREAL_RATE = 23.93447
 
 class Graph:
+    _layouts = {}  # Tick layouts from _tick_layout, shared by all graphs (oldest dropped past 32)
+
     def __init__(self, title="Graph"):
         self.title = title
 
     def setup(self, start, dt_min=10.0, duration_days=1.0):
         start = timetools.interpret_date(start, fmt='datetime')
-        daystart = timetools.interpret_date(timetools.interpret_date(start, '%Y-%m-%d'), fmt='datetime')
-        self.start = Time(daystart.replace(hour=start.hour))
+        self.start_datetime = start.replace(minute=0, second=0, microsecond=0)  # Naive UTC, on the hour
+        self.start = Time(self.start_datetime)
         self.end = self.start + TimeDelta(duration_days * DAYSEC, format='sec')
         self.T = duration_days
         self.N = int(self.T * DAYSEC / (dt_min * 60.0)) + 1
@@ -27,65 +31,104 @@ class Graph:
     def ticks_labels(self, tz, location, rowhdr, int_hr=2):
         self.rowhdr = rowhdr
         self.rows = []
-        self.current = self.cursor_position_t(timetools.interpret_date('now', fmt='Time'), round)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # Same cell as cursor_position_t(Time.now(), round)
+        self.current = int(round(((now - self.start_datetime).total_seconds() / DAYSEC / self.T) * self.N))
         self.show_current = self.current > -1 and self.current <= self.N
-        utc_t = Time([self.start + TimeDelta(int(x)*3600.0, format='sec') for x in range(0, 26, int_hr)], scale='utc')
-        self.lst = utc_t.sidereal_time('mean', longitude=location)
-        lstday = argmin(self.lst[:-1])
-        lsteq = datetime(year=self.start.datetime.year, month=self.start.datetime.month, day=self.start.datetime.day,
-                         hour=int(self.lst[0].hms.h), minute=int(self.lst[0].hms.m), second=int(self.lst[0].hms.s))
+        lon = u.Quantity(getattr(location, 'lon', location), u.deg)  # The LST only needs the longitude
+        # Everything but the 'now' cursor depends only on these, so the layout is shared between re-renders
+        key = (self.start_datetime, self.T, self.N, tz, lon.to_value(u.deg), int_hr)
+        if key not in Graph._layouts:
+            if len(Graph._layouts) >= 32:
+                Graph._layouts.pop(next(iter(Graph._layouts)))
+            Graph._layouts[key] = self._tick_layout(tz, lon, int_hr)
+        self.lst, tzorder, tzinfo, ticks = Graph._layouts[key]
+        self.tzorder, self.tzinfo = list(tzorder), dict(tzinfo)
+        self.ticks = {this_tz: dict(layout, labels=list(layout['labels']), ticks=list(layout['ticks']))
+                      for this_tz, layout in ticks.items()}
+        if self.show_current:
+            for layout in self.ticks.values():
+                layout['ticks'][self.current] = layout['current']
+
+    def _tick_layout(self, tz, lon, int_hr):
+        """Return the (lst, tzorder, tzinfo, ticks) of the time axes for ticks_labels, without the 'now' cursor."""
+        utc_t = self.start + TimeDelta([x * 3600.0 for x in range(0, 26, int_hr)], format='sec')  # One Time array, not one Time per tick
+        lst = utc_t.sidereal_time('mean', longitude=lon)
+        lst_hours = lst.hourangle  # Plain floats -- h/m/s below are split off as Angle.hms does (LST is >= 0)
+        lstday = argmin(lst_hours[:-1])
+        lst_h = int(lst_hours[0])
+        lst_m = int((lst_hours[0] - lst_h) * 60.0)
+        lst_s = int(((lst_hours[0] - lst_h) * 60.0 - lst_m) * 60.0)
+        startdt = self.start_datetime
+        lsteq = datetime(year=startdt.year, month=startdt.month, day=startdt.day, hour=lst_h, minute=lst_m, second=lst_s)
         if lstday: lsteq = lsteq - timedelta(days=1)
         elapsed = TimeDelta(((utc_t - utc_t[0]).to('second').value) * (1.0 - SIDEREAL_RATE/24.0), format='sec')
-        lst_l = Time([Time(lsteq.replace(minute=0, second=0, microsecond=0)) + TimeDelta(int(x)*3600.0, format='sec') for x in range(0, 27, int_hr)])
+        lst_l = Time(lsteq.replace(minute=0, second=0, microsecond=0)) + TimeDelta([x * 3600.0 for x in range(0, 27, int_hr)], format='sec')
         lstoff = (Time(lsteq) - lst_l[0]) - elapsed
-        utc_l = utc_t - TimeDelta(lstoff, format='sec')
-        self.tzorder = ['UTC', 'LST']
-        self.tzinfo = {'UTC': 0.0, 'LST': lstoff}
-        self.ticks = {'UTC': {'utc': utc_t,
-                              'times': utc_t,
-                              'current': '@'},
-                      'LST': {'utc': utc_l,
-                              'times': lst_l,
-                              'current': '@'}}
+        utc_l = utc_t - lstoff  # Already a TimeDelta
+        tzorder = ['UTC', 'LST']
+        tzinfo = {'UTC': 0.0, 'LST': lstoff}
+        ticks = {'UTC': {'utc': utc_t,
+                         'times': utc_t,
+                         'current': '@'},
+                 'LST': {'utc': utc_l,
+                         'times': lst_l,
+                         'current': '@'}}
         if tz.upper() != 'UTC':
             tz, tzoff = timetools.get_tz(tz, self.start)
-            self.tzorder = ['UTC', tz, 'LST']
-            self.tzinfo[tz] = tzoff
-            self.ticks[tz] = {'utc': utc_t,
-                              'times': utc_t + TimeDelta(self.tzinfo[tz] * 3600.0, format='sec'),
-                              'current': '@'}
-        for this_tz in self.tzinfo:
-            self.ticks[this_tz]['labels'] = [' '] * (self.N + 1)
-            self.ticks[this_tz]['ticks'] =[' '] * (self.N + 1)
-            for i in range(len(utc_t)):
-                toff = self.cursor_position_t(self.ticks[this_tz]['utc'][i], func=round)
+            tzorder = ['UTC', tz, 'LST']
+            tzinfo[tz] = tzoff
+            ticks[tz] = {'utc': utc_t,
+                         'times': utc_t + TimeDelta(tzinfo[tz] * 3600.0, format='sec'),
+                         'current': '@'}
+        utc_toffs = self.cursor_positions_t(utc_t, func=round)  # Shared by every tz on the UTC ticks (only LST differs)
+        for this_tz in tzinfo:
+            ticks[this_tz]['labels'] = [' '] * (self.N + 1)
+            ticks[this_tz]['ticks'] =[' '] * (self.N + 1)
+            if ticks[this_tz]['utc'] is utc_t:
+                toffs = utc_toffs
+            else:
+                toffs = self.cursor_positions_t(ticks[this_tz]['utc'], func=round)
+            hours = [t.hour for t in ticks[this_tz]['times'][:len(toffs)].datetime]
+            for toff, hour in zip(toffs, hours):
                 if toff < 0 or toff > self.N:
                     continue
-                self.ticks[this_tz]['ticks'][toff] = '|'
-                self.ticks[this_tz]['labels'][toff] = f"{self.ticks[this_tz]['times'][i].datetime.hour:02d}"
-            if self.show_current:
-                self.ticks[this_tz]['ticks'][self.current] = self.ticks[this_tz]['current']
+                ticks[this_tz]['ticks'][toff] = '|'
+                ticks[this_tz]['labels'][toff] = f"{hour:02d}"
+        return lst, tzorder, tzinfo, ticks
 
     def cursor_position_t(self, t, func):
         dt = (t - self.start).to('day').value
         return int(func( (dt/self.T) * self.N) )
 
+    def cursor_positions_t(self, t, func):
+        """Same as cursor_position_t for each time in the Time array t, with one subtraction for all of them."""
+        return [int(func((dt/self.T) * self.N)) for dt in (t - self.start).to('day').value.tolist()]
+
     def row(self, estart=None, estop=None):
-        row = ['.'] * (self.N + 1)
-        if estart is None or estop is None:
-            pass
-        else:
-            starting = 0 if estart < self.start else self.cursor_position_t(estart, func=floor)
-            ending = self.N if estop > self.end else self.cursor_position_t(estop, func=ceil)
-            for star in range(starting, ending):
-                row[star] = '*'
+        self.add_rows([estart], [estop])
+
+    def add_rows(self, estarts, estops):
+        """Same as row for each estart/estop pair, with the Time arithmetic done once over all of them."""
+        timed = [i for i, (estart, estop) in enumerate(zip(estarts, estops)) if estart is not None and estop is not None]
+        spans = [None] * len(estarts)
+        if timed:
+            starts, stops = Time([estarts[i] for i in timed]), Time([estops[i] for i in timed])
+            before, after = (starts < self.start).tolist(), (stops > self.end).tolist()
+            startings, endings = self.cursor_positions_t(starts, func=floor), self.cursor_positions_t(stops, func=ceil)
+            for j, i in enumerate(timed):
+                spans[i] = (0 if before[j] else startings[j], self.N if after[j] else endings[j])
+        for span in spans:
+            self._add_row(span)
+
+    def _add_row(self, span):
+        """Each row is kept as one str of N+1 cells rather than a list of 1-char cells."""
+        starting, ending = span if span is not None and span[1] > span[0] else (0, 0)
+        row = '.' * starting + '*' * (ending - starting) + '.' * (self.N + 1 - ending)
         if self.show_current:
-            row[self.current] = '@'
+            row = row[:self.current] + '@' + row[self.current + 1:]
         self.rows.append(row)
 
     def make_table(self):
-        import tabulate
-        tabulate.PRESERVE_WHITESPACE = True
         maxrhdr = 4 if (self.rowhdr is None or self.rowhdr[0] is None) else max([len(x[1]) for x in self.rowhdr])
         self.g_info = {'width': [2, maxrhdr] + [1] * (self.N+1), 'rows': []}
         for this_tz in self.tzorder:
@@ -95,15 +138,20 @@ class Graph:
         for i, row in enumerate(self.rows):
             srh = ' ' if self.rowhdr[i] is None else self.rowhdr[i][1]
             enh = ' ' if self.rowhdr[i] is None else self.rowhdr[i][0]
-            self.g_info['rows'].append([enh, srh] + row)
+            self.g_info['rows'].append([enh, srh] + list(row))
         self.g_info['rows'].append([' ', ' '] + self.ticks['LST']['ticks'])
         self.g_info['rows'].append([' ', 'LST'] + self.ticks['LST']['labels'])
 
         table = []
         for rowstr in self.g_info['rows']:
-            d0 = [x[0] for x in rowstr[2:]] + [' ']
-            d1 = [' '] + [x[1] if len(x) > 1 else ' ' for x in rowstr[2:]]
-            xx = [aa if aa != ' ' else bb for aa, bb in zip(d0, d1)]
-            this_row = [rowstr[0], rowstr[1], ''.join(xx)]
-            table.append(this_row)
-        self.tabulated = tabulate.tabulate(table, tablefmt='plain', colalign=('right', 'right', 'left'))
+            cells = rowstr[2:]
+            if max(map(len, cells)) == 1:  # Nothing spills into the next cell (all but the label rows)
+                xx = ''.join(cells) + ' '
+            else:
+                d0 = [x[0] for x in cells] + [' ']
+                d1 = [' '] + [x[1] if len(x) > 1 else ' ' for x in cells]
+                xx = ''.join([aa if aa != ' ' else bb for aa, bb in zip(d0, d1)])
+            table.append([rowstr[0], rowstr[1], xx])
+        # tabulate's 'plain' layout (right, right, left; two-space gaps), with the graph's whitespace kept as is
+        w0, w1 = max(len(str(row[0])) for row in table), max(len(str(row[1])) for row in table)
+        self.tabulated = '\n'.join([f"{row[0]!s:>{w0}}  {row[1]!s:>{w1}}  {row[2]}".rstrip() for row in table])
@@ -1,15 +1,16 @@
 #! /usr/bin/env python
 
 import argparse
-from odsutils import ods_engine
 
 ap = argparse.ArgumentParser()
-ap.add_argument('--url', help="URL to monitor", default="https://ods.hcro.org/ods.json")
+ap.add_argument('--url', help="URL(s) to monitor", nargs='+', default=["https://ods.hcro.org/ods.json"])
 ap.add_argument('--logfile', help="Name of monitor log file", default='online_ods_mon.txt')
 ap.add_argument('--version', help="Version type to check for", default='latest')
 ap.add_argument('--cols', help="Columns to output to monitor file -- 'all' or csv-list.", default='all')
 ap.add_argument('--output', help="Logging output level", default='INFO')
 args = ap.parse_args()
 
+from odsutils import ods_engine  # After the arguments, so --help doesn't wait on astropy
+
 ods = ods_engine.ODS(version=args.version, output=args.output)
 ods.online_ods_monitor(url=args.url, logfile=args.logfile, cols=args.cols)
\ No newline at end of file
@@ -1,6 +1,5 @@
 #! /usr/bin/env python
 import argparse
-from odsutils import ods_engine
 
 ap = argparse.ArgumentParser()
 ap.add_argument('inputs', help='Inputs to show', nargs='?', default=None)
@@ -9,13 +8,15 @@ args = ap.parse_args()
 
 if args.inputs is None:
     from odsutils import DATA_PATH
-    from glob import glob
-    defaults_files = glob(f"{DATA_PATH}/*.json")
+    import os
+    with os.scandir(DATA_PATH) as dir_entries:  # The names directly -- no path to build and split back apart
+        defaults_files = [entry.name for entry in dir_entries if entry.name.endswith('.json') and entry.name[0] != '.']
     print("Available system defaults files:")
     for df in defaults_files:
-        print('\t', df.split('/')[-1])
+        print('\t', df)
     print("To view, use name but prepend a '$' and don't forget to escape it.")
 else:
+    from odsutils import ods_engine  # Only here -- listing the defaults files needs none of astropy
     ods = ods_engine.ODS(version='latest', defaults=args.inputs)
     if args.inputs[0] == '$':
         ods.new_record()
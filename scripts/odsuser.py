@@ -1,6 +1,5 @@
 #! /usr/bin/env python
 import argparse
-from odsutils import ods_engine
 
 ap = argparse.ArgumentParser()
 ap.add_argument('-o', '--ods_file', help="Name of ods json file to read.", default=None)
@@ -51,6 +50,8 @@ ap.add_argument('--notes', help="ODS field", default=None)
 
 args = ap.parse_args()
 
+from odsutils import ods_engine  # After the arguments, so --help doesn't wait on astropy
+
 ods = ods_engine.ODS(version=args.version, conlog=args.output.upper(), filelog=args.filelog)
 if args.std_show:
     print(ods.ods[ods.working_instance].standard)